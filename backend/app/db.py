@@ -1,15 +1,41 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from .settings import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+def async_database_url(url: str) -> str:
+    """Accept the usual psycopg2/plain Postgres URL and run it on asyncpg."""
+    if url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url[len("postgresql+psycopg2://"):]
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    return url
 
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+)
+
+# expire_on_commit=False: attributes stay readable after commit without an
+# implicit (and in async, impossible) lazy refresh
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+def create_missing_indexes(conn) -> None:
+    """create_all() skips tables that already exist, indexes included: add any declared since."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+async def sequence_value(db: AsyncSession, seq) -> int:
+    """Last value handed out by a sequence, 0 before its first nextval(); takes no lock."""
+    return (await db.execute(text(
+        f"SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM {seq.name}"
+    ))).scalar_one()
+
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
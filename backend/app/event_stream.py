@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from .models import Event
+
+HISTORY_SIZE = 2000     # deltas kept for Last-Event-ID resume
+QUEUE_SIZE = 256        # per-subscriber backlog before it is cut off
+
+def event_delta(evt: Event, ts: str) -> Dict[str, Any]:
+    """Small stream payload for one accepted transition (built before commit expires `evt`)."""
+    return {
+        "event_id": evt.id,
+        "camera_id": evt.camera_id,
+        "event_type": evt.event_type,
+        "severity": evt.severity,
+        "state": evt.state,
+        "ts": ts,
+        "snapshot_url": f"/media/{evt.snapshot_path}" if evt.snapshot_path else None,
+    }
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(QUEUE_SIZE)
+        # set when a delta had to be dropped; the stream then ends so the
+        # client reconnects with Last-Event-ID and replays from history
+        self.overflowed = False
+
+    def push(self, delta: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(delta)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+class EventBroker:
+    """
+    In-process fan-out of ingest transitions to /events/stream clients.
+    Deltas carry a monotonically increasing `seq` used as the SSE id.
+    Only sees ingests handled by this worker process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=HISTORY_SIZE)
+        self._subs: Set[Subscriber] = set()
+
+    def publish(self, deltas: List[Dict[str, Any]]) -> None:
+        """Thread-safe; may be called from sync route threads."""
+        if not deltas:
+            return
+        with self._lock:
+            for d in deltas:
+                self._seq += 1
+                d["seq"] = self._seq
+                self._history.append(d)
+            subs = list(self._subs)
+        for sub in subs:
+            for d in deltas:
+                sub.loop.call_soon_threadsafe(sub.push, d)
+
+    def subscribe(self, since: Optional[int]) -> Tuple[Subscriber, List[Dict[str, Any]]]:
+        """Register a subscriber; returns it plus the history newer than `since`."""
+        sub = Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            backlog = [d for d in self._history if since is not None and d["seq"] > since]
+            self._subs.add(sub)
+        return sub, backlog
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            self._subs.discard(sub)
+
+def format_sse(delta: Dict[str, Any]) -> str:
+    return f"id: {delta['seq']}\nevent: event\ndata: {json.dumps(delta)}\n\n"
+
+event_broker = EventBroker()
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import SessionLocal, sequence_value
+from .models import CameraVersion, cache_version_seq
+
+class Versions:
+    """
+    Monotonic change counters, one global and one per camera, kept in
+    Postgres so every worker sees the same values. Bump after the data
+    commit, never inside it: a reader that sees the new version must also
+    see the new rows.
+    """
+
+    async def bump(self, camera_ids: Iterable[str]) -> None:
+        cids = sorted(set(camera_ids))      # fixed order: no upsert deadlocks
+        async with SessionLocal() as db:
+            version = (await db.execute(select(cache_version_seq.next_value()))).scalar_one()
+            if cids:
+                stmt = pg_insert(CameraVersion).values([{"camera_id": c, "version": version} for c in cids])
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=[CameraVersion.camera_id],
+                    set_={"version": func.greatest(CameraVersion.version, stmt.excluded.version)},
+                ))
+            await db.commit()
+
+    async def current(self, db: AsyncSession, camera_id: Optional[str] = None) -> int:
+        if camera_id is None:
+            return await sequence_value(db, cache_version_seq)
+        version = await db.scalar(select(CameraVersion.version).where(CameraVersion.camera_id == camera_id))
+        return version or 0
+
+class ResponseCache:
+    """Bounded LRU of serialized response bodies keyed by (endpoint, params, version)."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None:
+                self._data.move_to_end(key)
+            return hit
+
+    def put(self, key: Hashable, value: Tuple[bytes, Dict[str, str]]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+versions = Versions()
+response_cache = ResponseCache()
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    inm = request.headers.get("if-none-match")
+    if not inm:
+        return False
+    return inm.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in inm.split(",")]
+
+async def cached_json(
+    request: Request,
+    key: Tuple[Hashable, ...],
+    version: Hashable,
+    build: Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]],
+) -> Response:
+    """
+    Serve a JSON body that only changes when `version` does.
+    `build` is a coroutine returning (content, extra headers); its output is
+    cached per (key, version) and the client gets an ETag / 304 on repeats.
+    Read `version` before querying so a concurrent bump can only make the
+    cached body newer than its tag, never older.
+    """
+    digest = hashlib.sha1(repr((key, version)).encode("utf-8")).hexdigest()[:20]
+    etag = f'"{digest}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    cache_key = (key, version)
+    hit = response_cache.get(cache_key)
+    if hit is None:
+        content, headers = await build()
+        body = content if isinstance(content, bytes) else json.dumps(
+            jsonable_encoder(content), separators=(",", ":")
+        ).encode("utf-8")
+        hit = (body, headers)
+        response_cache.put(cache_key, hit)
+
+    body, headers = hit
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**headers, "ETag": etag, "Cache-Control": "no-cache"},
+    )
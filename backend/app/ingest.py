@@ -0,0 +1,156 @@
+from datetime import datetime
+from typing import Optional, Tuple, List, Dict, Any
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from .models import Event
+from .registry import camera_registry
+from .event_stream import event_broker, event_delta
+from .httpcache import versions
+from .media import content_address, thumbnails
+from .schemas import EventIn
+
+STATES = ("start", "ongoing", "peak", "end")
+
+# rows per multi-row upsert: the driver allows at most 32767 bind parameters
+UPSERT_ROWS = 32767 // len(Event.__table__.columns)
+
+def parse_ts(ts: str) -> datetime:
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00")).replace(tzinfo=None)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid ts format (expected ISO8601 ending with Z)")
+
+def check_payload(payload: EventIn) -> None:
+    """Validate what can be checked without touching the events table."""
+    parse_ts(payload.ts)
+    if payload.state not in STATES:
+        raise HTTPException(status_code=400, detail="Invalid state (start/ongoing/peak/end)")
+
+def apply_transition(evt: Optional[Event], payload: EventIn) -> Tuple[Optional[Event], Dict[str, Any]]:
+    """
+    Apply one start/ongoing/peak/end transition to `evt` (None if the event
+    does not exist yet). Returns the event to persist (None when nothing
+    changed) and the per-item result. Raises HTTPException on bad input.
+    The snapshot is left to attach_snapshot(), once the transition is accepted.
+    """
+    state = payload.state
+    ts = parse_ts(payload.ts)
+
+    if state == "start":
+        if evt:
+            return None, {"ok": True, "event_id": payload.event_id, "note": "already exists"}
+        evt = Event(
+            id=payload.event_id,
+            camera_id=payload.camera_id,
+            event_type=payload.event_type,
+            severity=payload.severity,
+            state="start",
+            ts_start=ts,
+            ts_peak=ts,
+            clip_path=payload.clip_path,
+            meta=payload.meta or {},
+        )
+
+    elif state in ("ongoing", "peak"):
+        if not evt:
+            raise HTTPException(status_code=404, detail="event not found")
+        evt.state = state
+        evt.severity = max(evt.severity, payload.severity)
+        evt.ts_peak = ts
+        if payload.clip_path:
+            evt.clip_path = payload.clip_path
+        if payload.meta is not None:
+            evt.meta = payload.meta
+
+    elif state == "end":
+        if not evt:
+            raise HTTPException(status_code=404, detail="event not found")
+        evt.state = "end"
+        evt.ts_end = ts
+        evt.ts_peak = evt.ts_peak or ts
+        if payload.clip_path:
+            evt.clip_path = payload.clip_path
+        if payload.meta is not None:
+            evt.meta = payload.meta
+
+    else:
+        raise HTTPException(status_code=400, detail="Invalid state (start/ongoing/peak/end)")
+
+    return evt, {"ok": True, "event_id": payload.event_id, "state": state}
+
+async def attach_snapshot(evt: Event, payload: EventIn) -> None:
+    """
+    Move the payload's snapshot to its content address and record it on the
+    event. A scratch file that is already gone (a retried request) keeps the
+    event's stored path.
+    """
+    payload.snapshot_path = await run_in_threadpool(content_address, payload.snapshot_path)
+    if payload.snapshot_path:
+        evt.snapshot_path = payload.snapshot_path
+
+def _event_row(evt: Event) -> Dict[str, Any]:
+    row = {c.name: getattr(evt, c.key) for c in Event.__table__.columns}
+    row["created_at"] = row["created_at"] or datetime.utcnow()
+    return row
+
+async def apply_batch(db: AsyncSession, payloads: List[EventIn]) -> List[Dict[str, Any]]:
+    """
+    Apply a list of transitions in order and write every touched event with
+    INSERT .. ON CONFLICT DO UPDATE (UPSERT_ROWS rows per statement) in one
+    transaction.
+    Bad items are reported in the results and do not abort the batch.
+    """
+    event_ids = {p.event_id for p in payloads}
+    events: Dict[str, Event] = {}
+    res = await db.execute(select(Event).where(Event.id.in_(event_ids)))
+    for e in res.scalars().all():
+        # detach so in-memory changes are written only by the upsert below
+        db.expunge(e)
+        events[e.id] = e
+
+    touched: Dict[str, Event] = {}
+    deltas = []
+    snapshots = []
+    results = []
+    for p in payloads:
+        if not await camera_registry.exists(p.camera_id):
+            results.append({"ok": False, "event_id": p.event_id, "error": "Invalid camera_id"})
+            continue
+        try:
+            evt, result = apply_transition(events.get(p.event_id), p)
+        except HTTPException as e:
+            results.append({"ok": False, "event_id": p.event_id, "error": e.detail})
+            continue
+        if evt is not None:
+            await attach_snapshot(evt, p)
+            events[evt.id] = evt
+            touched[evt.id] = evt
+            deltas.append(event_delta(evt, p.ts))
+            if p.snapshot_path:
+                snapshots.append(p.snapshot_path)
+        results.append(result)
+
+    rows = [_event_row(e) for e in touched.values()]
+    for i in range(0, len(rows), UPSERT_ROWS):
+        stmt = pg_insert(Event).values(rows[i:i + UPSERT_ROWS])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Event.id],
+            set_={
+                c.name: stmt.excluded[c.name]
+                for c in Event.__table__.columns
+                if c.name not in ("id", "created_at")
+            },
+        )
+        await db.execute(stmt)
+    await db.commit()
+    if touched:
+        await versions.bump(d["camera_id"] for d in deltas)
+    event_broker.publish(deltas)
+    for path in snapshots:
+        thumbnails.submit(path)
+    return results
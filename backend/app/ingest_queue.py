@@ -0,0 +1,205 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from .db import SessionLocal
+from .ingest import apply_batch
+from .media import discard_scratch
+from .schemas import EventIn
+from .settings import settings
+
+log = logging.getLogger(__name__)
+
+# updates that only overwrite the row and can be folded into each other
+COALESCE_STATES = ("ongoing", "peak")
+MAX_BACKOFF_SEC = 30.0
+
+def _coalesce(prev: EventIn, cur: EventIn) -> EventIn:
+    """
+    Merge two consecutive ongoing/peak updates so applying the result equals
+    applying both (except for the superseded snapshot file, see _put).
+    """
+    return cur.model_copy(update={
+        "severity": max(prev.severity, cur.severity),
+        "snapshot_path": cur.snapshot_path or prev.snapshot_path,
+        "clip_path": cur.clip_path or prev.clip_path,
+        "meta": cur.meta if cur.meta is not None else prev.meta,
+    })
+
+class IngestQueue:
+    """
+    Write-behind buffer for async ingest mode.
+    Keeps pending transitions per event_id (start/end kept in order, runs of
+    ongoing/peak coalesced into one) and flushes them with apply_batch every
+    `flush_ms` or as soon as `flush_max` items are pending, at most
+    `flush_max` items per statement. Holds at most `max_pending` items;
+    callers check `full` and shed load (503) beyond that.
+    A batch that fails `max_retries` times in a row is applied one item at a
+    time and the items that still fail are logged and dropped, so one bad
+    item cannot block the queue; while the database is unreachable nothing
+    is dropped and the items are retried, `flush_ms` after the first failed
+    flush and twice as long after each further one (up to MAX_BACKOFF_SEC).
+    Runs as a task on the app's event loop; put() must be called from it.
+    """
+
+    def __init__(self, flush_ms: int, flush_max: int, max_pending: int, max_retries: int = 3):
+        self.flush_ms = flush_ms
+        self.flush_max = flush_max
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self._pending: Dict[str, List[EventIn]] = {}
+        self._count = 0
+        self._superseded: List[str] = []
+        self._failures = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._stop = False
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"received": 0, "coalesced": 0, "written": 0, "failed": 0, "rejected": 0}
+
+    @property
+    def full(self) -> bool:
+        return self._count >= self.max_pending
+
+    def _put(self, payload: EventIn) -> None:
+        items = self._pending.setdefault(payload.event_id, [])
+        if items and payload.state in COALESCE_STATES and items[-1].state in COALESCE_STATES:
+            prev = items[-1].snapshot_path
+            if prev and payload.snapshot_path and payload.snapshot_path != prev:
+                self._superseded.append(prev)     # no event will ever reference it
+            items[-1] = _coalesce(items[-1], payload)
+            self.stats["coalesced"] += 1
+        else:
+            items.append(payload)
+            self._count += 1
+
+    def put(self, payload: EventIn) -> None:
+        self.stats["received"] += 1
+        self._put(payload)
+        # a backlog must not cut a post-failure backoff short
+        if self._count >= self.flush_max and not self._failures and self._wake is not None:
+            self._wake.set()
+
+    def _take(self, limit: int) -> List[EventIn]:
+        """Oldest events first, whole per-event runs, until about `limit` items."""
+        batch: List[EventIn] = []
+        for event_id in list(self._pending):
+            if len(batch) >= limit:
+                break
+            items = self._pending.pop(event_id)
+            self._count -= len(items)
+            batch.extend(items)
+        return batch
+
+    def _requeue(self, batch: List[EventIn]) -> None:
+        # failed batch goes back in front of anything queued since
+        newer, self._pending, self._count = self._pending, {}, 0
+        for p in batch:
+            self._put(p)
+        for items in newer.values():
+            for p in items:
+                self._put(p)
+
+    def _record(self, results) -> None:
+        for r in results:
+            if r["ok"]:
+                self.stats["written"] += 1
+            else:
+                self.stats["failed"] += 1
+                log.warning("ingest dropped %s: %s", r["event_id"], r["error"])
+
+    async def _db_alive(self) -> bool:
+        try:
+            async with SessionLocal() as db:
+                await db.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            return False
+
+    async def _write_each(self, batch: List[EventIn]) -> List[EventIn]:
+        """
+        Apply items one by one. Failures are dropped if the database is
+        reachable (the items themselves are bad); otherwise they are returned
+        to be retried.
+        """
+        failed = []
+        for p in batch:
+            try:
+                async with SessionLocal() as db:
+                    self._record(await apply_batch(db, [p]))
+            except Exception as e:
+                failed.append((p, e))
+        if not failed:
+            return []
+        if not await self._db_alive():
+            return [p for p, _ in failed]
+        for p, e in failed:
+            self.stats["failed"] += 1
+            log.error("ingest dropped %s (%s) after %d failed flushes: %s",
+                      p.event_id, p.state, self.max_retries, e)
+        return []
+
+    async def _write(self, batch: List[EventIn]) -> List[EventIn]:
+        """Write a batch; returns the items that must be retried."""
+        if self._failures >= self.max_retries:
+            return await self._write_each(batch)
+        try:
+            async with SessionLocal() as db:
+                self._record(await apply_batch(db, batch))
+            return []
+        except Exception:
+            log.exception("ingest flush failed, requeueing %d items", len(batch))
+            return batch
+
+    async def flush(self) -> None:
+        """Write everything pending, `flush_max` items per statement; stop at the first failure."""
+        while self._count:
+            retry = await self._write(self._take(self.flush_max))
+            if not retry:
+                self._failures = 0
+                continue
+            self._failures += 1
+            self._requeue(retry)
+            return
+
+    def _delay(self) -> float:
+        """Seconds until the next flush: `flush_ms`, doubled for each failure after the first."""
+        return min(self.flush_ms / 1000.0 * 2 ** min(max(self._failures - 1, 0), 16), MAX_BACKOFF_SEC)
+
+    async def _run(self) -> None:
+        while True:
+            if not self._stop and (self._failures or self._count < self.flush_max):
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self._delay())
+                except asyncio.TimeoutError:
+                    pass
+            self._wake.clear()
+            stop = self._stop
+            await self.flush()
+            if self._superseded:
+                paths, self._superseded = self._superseded, []
+                await asyncio.to_thread(discard_scratch, paths)
+            if stop:
+                return
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stop = False
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer after a final flush."""
+        if self._task is None:
+            return
+        self._stop = True
+        self._wake.set()
+        await self._task
+        self._task = None
+
+ingest_queue = IngestQueue(
+    settings.INGEST_FLUSH_MS, settings.INGEST_FLUSH_MAX,
+    settings.INGEST_MAX_PENDING, settings.INGEST_MAX_RETRIES,
+)
@@ -0,0 +1,96 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Optional
+
+from fastapi import HTTPException
+
+from .security import verify_password
+from .settings import settings
+
+def _too_many(detail: str, retry_after: int) -> HTTPException:
+    return HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(retry_after)})
+
+class LoginPool:
+    """
+    bcrypt verification in a small dedicated process pool.
+    At most `workers + max_queue` verifications are admitted at once; the
+    rest are rejected immediately with 429 instead of piling up behind the
+    pool and starving other requests.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight = 0
+        self.rejected = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: never fork a process that already runs an event loop and threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        if self._inflight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise _too_many("Too many concurrent logins, retry shortly", 1)
+        self._inflight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool(), verify_password, password, hashed)
+        finally:
+            self._inflight -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+class AttemptLimiter:
+    """Sliding-window count of failed logins per key (e.g. "acct:<email>", "ip:<addr>")."""
+
+    MAX_KEYS = 100_000
+
+    def __init__(self, window_sec: int):
+        self.window_sec = window_sec
+        self._lock = threading.Lock()
+        self._fails: Dict[str, Deque[float]] = {}
+
+    def _recent(self, key: str, now: float) -> int:
+        q = self._fails.get(key)
+        if not q:
+            return 0
+        while q and q[0] <= now - self.window_sec:
+            q.popleft()
+        if not q:
+            del self._fails[key]
+            return 0
+        return len(q)
+
+    def check(self, key: str, limit: int) -> None:
+        with self._lock:
+            if self._recent(key, time.time()) >= limit:
+                raise _too_many("Too many failed login attempts, try again later", self.window_sec)
+
+    def record_failure(self, keys: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            if len(self._fails) > self.MAX_KEYS:
+                for k in list(self._fails):
+                    self._recent(k, now)
+            for k in keys:
+                self._fails.setdefault(k, deque()).append(now)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._fails.pop(key, None)
+
+login_pool = LoginPool(settings.LOGIN_WORKERS, settings.LOGIN_MAX_QUEUE)
+login_limiter = AttemptLimiter(settings.LOGIN_WINDOW_SEC)
@@ -1,11 +1,10 @@
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
 
 from .settings import settings
-from .db import engine, Base
+from .db import engine, Base, SessionLocal, create_missing_indexes
 
 # IMPORTANT: force model import so SQLAlchemy registers tables
 from . import models  # noqa: F401
@@ -15,7 +14,15 @@ from .routes.dev import router as dev_router
 from .routes.cameras import router as cameras_router
 from .routes.events import router as events_router
 from .routes.timeline import router as timeline_router
-from fastapi.middleware.cors import CORSMiddleware
+from .routes.media import router as media_router
+from .routes.recordings import router as recordings_router
+from .ingest_queue import ingest_queue
+from .registry import camera_registry
+from .pagination import CURSOR_HEADER
+from .security import token_cache
+from .login_guard import login_pool
+from .media import thumbnails
+from .retention import retention
 
 
 
@@ -31,31 +38,48 @@ def create_app() -> FastAPI:
 
     app = FastAPI(title="rada-ai v1 backend")
 
-   origins = [
-  "http://localhost:5173",
-  "https://demo.rada-ai.ma",
-  "https://www.rada-ai.ma",
-]
-
-app.add_middleware(
-  CORSMiddleware,
-  allow_origins=origins,
-  allow_credentials=True,
-  allow_methods=["*"],
-  allow_headers=["*"],
-)
-
-    app.mount("/media", StaticFiles(directory=settings.MEDIA_DIR), name="media")
+    origins = [
+        "http://localhost:5173",
+        "https://demo.rada-ai.ma",
+        "https://www.rada-ai.ma",
+    ]
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[CURSOR_HEADER],
+    )
 
     app.include_router(dev_router)
     app.include_router(auth_router)
     app.include_router(cameras_router)
     app.include_router(events_router)
     app.include_router(timeline_router)
+    app.include_router(media_router)
+    app.include_router(recordings_router)
 
     @app.on_event("startup")
-    def on_startup():
-        Base.metadata.create_all(bind=engine)
+    async def on_startup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(create_missing_indexes)
+        async with SessionLocal() as db:
+            await camera_registry.load(db)
+        if settings.INGEST_MODE == "async":
+            ingest_queue.start()
+        if settings.RETENTION_ENABLED:
+            retention.start()
+
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        await ingest_queue.stop()
+        await retention.stop()
+        login_pool.shutdown()
+        thumbnails.shutdown()
+        await engine.dispose()
 
     @app.get("/")
     def root():
@@ -63,7 +87,8 @@ app.add_middleware(
 
     @app.get("/health")
     def health():
-        return {"ok": True}
+        return {"ok": True, "token_cache": token_cache.stats(), "retention": retention.stats,
+                "ingest_queue": ingest_queue.stats}
 
     return app
 
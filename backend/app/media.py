@@ -0,0 +1,235 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Set, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from PIL import Image
+
+from .settings import settings
+
+log = logging.getLogger(__name__)
+
+THUMB_SUFFIX = ".thumb.jpg"
+
+# snapshots/ab/ab12...(64 hex)[.thumb].jpg
+CONTENT_ADDRESSED = re.compile(r"(?:^|/)([0-9a-f]{2})/(\1[0-9a-f]{62})((?:\.thumb)?\.[A-Za-z0-9]+)$")
+
+def media_abspath(rel_path: str) -> Optional[str]:
+    """Absolute path of a media-relative path, or None if it escapes MEDIA_DIR."""
+    root = os.path.realpath(settings.MEDIA_DIR)
+    path = os.path.realpath(os.path.join(root, rel_path))
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+def is_content_addressed(rel_path: str) -> bool:
+    return CONTENT_ADDRESSED.search(rel_path) is not None
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _scratch_abspath(rel_path: str) -> Optional[str]:
+    """
+    Absolute path of a producer's snapshot, or None unless it is inside
+    SNAPSHOTS_DIR: ingest is unauthenticated, so it must never move or
+    delete clips or recording segments.
+    """
+    path = media_abspath(rel_path)
+    root = os.path.realpath(settings.SNAPSHOTS_DIR)
+    if path is None or os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+def content_address(rel_path: Optional[str]) -> Optional[str]:
+    """
+    Move a freshly written snapshot to <dir>/<h[:2]>/<sha256><ext> and return
+    the new relative path. Identical content is stored once. Hashed paths are
+    returned unchanged; None for files outside SNAPSHOTS_DIR or already gone
+    (moved by an earlier, retried request).
+    """
+    if not rel_path or is_content_addressed(rel_path):
+        return rel_path
+    src = _scratch_abspath(rel_path)
+    if src is None or not os.path.isfile(src):
+        return None
+
+    digest = _sha256_file(src)
+    rel_dir, name = os.path.split(rel_path)
+    ext = os.path.splitext(name)[1].lower()
+    rel_new = "/".join(p for p in (rel_dir.replace(os.sep, "/"), digest[:2], digest + ext) if p)
+    dst = media_abspath(rel_new)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.exists(dst):
+        os.remove(src)      # duplicate content
+        # newly referenced: restart its retention age (thumbnail last, so it stays up to date)
+        os.utime(dst)
+        thumb = media_abspath(thumb_path_for(rel_new))
+        if os.path.exists(thumb):
+            os.utime(thumb)
+    else:
+        os.replace(src, dst)
+    return rel_new
+
+def discard_scratch(rel_paths: List[str]) -> None:
+    """Delete producer scratch files no event will reference (never a shared, hashed one)."""
+    for rel_path in rel_paths:
+        if is_content_addressed(rel_path):
+            continue
+        src = _scratch_abspath(rel_path)
+        if src is None:
+            continue
+        try:
+            os.remove(src)
+        except OSError:
+            pass
+
+def thumb_path_for(rel_path: str) -> str:
+    """snapshots/evt_x.jpg -> snapshots/evt_x.thumb.jpg (stored next to the original)."""
+    return os.path.splitext(rel_path)[0] + THUMB_SUFFIX
+
+def thumb_url_for(rel_path: Optional[str]) -> Optional[str]:
+    return f"/media/{thumb_path_for(rel_path)}" if rel_path else None
+
+def make_thumbnail(rel_path: str) -> Optional[str]:
+    """Write a THUMB_WIDTH-wide JPEG rendition next to `rel_path`; returns its relative path."""
+    src = media_abspath(rel_path)
+    if src is None or not os.path.isfile(src):
+        return None
+    rel_thumb = thumb_path_for(rel_path)
+    dst = media_abspath(rel_thumb)
+    if os.path.exists(dst) and os.path.getmtime(dst) >= os.path.getmtime(src):
+        return rel_thumb    # up to date (always the case for content-addressed originals)
+    tmp = f"{dst}.{threading.get_ident()}.tmp"
+
+    width = settings.THUMB_WIDTH
+    with Image.open(src) as im:
+        # JPEG draft mode decodes at 1/2..1/8 scale directly, far cheaper than a full decode
+        im.draft("RGB", (width, width))
+        im = im.convert("RGB")
+        if im.width > width:
+            im = im.resize((width, max(1, im.height * width // im.width)), Image.BILINEAR)
+        im.save(tmp, "JPEG", quality=settings.THUMB_QUALITY)
+    os.replace(tmp, dst)
+    return rel_thumb
+
+class ThumbnailWorker:
+    """Renders thumbnails off the request path; repeated requests for a queued path collapse."""
+
+    def __init__(self, workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbs")
+        self._lock = threading.Lock()
+        self._queued: Set[str] = set()
+
+    def submit(self, rel_path: Optional[str]) -> None:
+        if not rel_path:
+            return
+        with self._lock:
+            if rel_path in self._queued:
+                return
+            self._queued.add(rel_path)
+        self._executor.submit(self._run, rel_path)
+
+    def _run(self, rel_path: str) -> None:
+        with self._lock:
+            self._queued.discard(rel_path)
+        try:
+            make_thumbnail(rel_path)
+        except Exception:
+            log.exception("thumbnail failed for %s", rel_path)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+thumbnails = ThumbnailWorker()
+
+# ─── serving ─────────────────────────────────────────────────────────────────
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+CHUNK = 256 * 1024
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single `bytes=a-b` / `a-` / `-n` range -> inclusive (start, end).
+    None for anything malformed, inverted or unsupported (serve the whole
+    file); ValueError only if the range is valid but unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    if not (first or last) or any(p and not p.isdigit() for p in (first, last)):
+        return None
+    if first:
+        start = int(first)
+        end = int(last) if last else max(start, size - 1)
+        if end < start:
+            return None
+    else:
+        n = int(last)
+        if n == 0:
+            raise ValueError("empty suffix range")
+        start, end = max(0, size - n), size - 1
+    if start >= size:
+        raise ValueError("unsatisfiable range")
+    return start, min(end, size - 1)
+
+def _iter_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def file_response(
+    request: Request, path: str, media_type: str, etag: str, cache_control: str
+) -> Response:
+    """
+    Serve a file with a strong ETag, If-None-Match -> 304 and single-range
+    (206) support. Only the requested byte range is read from disk.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+    inm = request.headers.get("if-none-match")
+    if inm and (inm.strip() == "*" or etag in [t.strip() for t in inm.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    size = os.path.getsize(path)
+    start, end, status = 0, size - 1, 200
+    range_header = request.headers.get("range")
+    if range_header and size > 0:
+        try:
+            rng = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if rng is not None:
+            start, end = rng
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    length = max(0, end - start + 1)
+    headers["Content-Length"] = str(length)
+    if request.method == "HEAD":
+        return Response(status_code=status, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        _iter_file(path, start, length), status_code=status, headers=headers, media_type=media_type
+    )
+
+def media_etag(rel_path: str, path: str) -> Tuple[str, str]:
+    """(ETag, Cache-Control) for a media file: content hash for hashed names, else size+mtime."""
+    m = CONTENT_ADDRESSED.search(rel_path)
+    if m:
+        return f'"{m.group(2)}{m.group(3)}"', IMMUTABLE
+    st = os.stat(path)
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"', REVALIDATE
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Integer, JSON
+from sqlalchemy import BigInteger, Column, String, DateTime, Integer, JSON, Index, Sequence
 from .db import Base
 
 class User(Base):
@@ -37,3 +37,36 @@ class Event(Base):
 
     meta = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    # keyset pagination: ORDER BY ts_start DESC, id DESC (optionally per camera)
+    __table_args__ = (
+        Index("ix_events_ts_start_id", "ts_start", "id"),
+        Index("ix_events_camera_ts_start_id", "camera_id", "ts_start", "id"),
+    )
+
+class RecordingSegment(Base):
+    """One closed continuous-recording segment file (see simulator/recorder.py)."""
+    __tablename__ = "recording_segments"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    camera_id = Column(String, nullable=False)
+    ts_start = Column(DateTime, nullable=False)
+    ts_end = Column(DateTime, nullable=False)
+    path = Column(String, nullable=False, unique=True)   # relative path under media/
+    byte_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_recording_segments_camera_ts_start", "camera_id", "ts_start"),
+    )
+
+# response cache versions shared by all workers (see httpcache.Versions):
+# the sequence is the global version, camera_versions the per-camera ones
+cache_version_seq = Sequence("cache_version_seq", metadata=Base.metadata)
+
+# bumped by every camera write; workers compare it to reload their registry
+camera_list_seq = Sequence("camera_list_seq", metadata=Base.metadata)
+
+class CameraVersion(Base):
+    __tablename__ = "camera_versions"
+    camera_id = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False)
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional, Tuple, Dict
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+from .models import Event
+
+# cursor = "<ts_start isoformat>,<event id>" of the last row of the previous page
+CURSOR_HEADER = "X-Next-Cursor"
+
+def parse_cursor(before: str) -> Tuple[datetime, str]:
+    try:
+        ts, eid = before.split(",", 1)
+        return datetime.fromisoformat(ts), eid
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor (expected before=<ts_start>,<id>)")
+
+def make_cursor(ts_start: datetime, event_id: str) -> str:
+    return f"{ts_start.isoformat()},{event_id}"
+
+def keyset_page(query, before: Optional[str], limit: int):
+    """Newest-first page of an Event select(), strictly older than the `before` cursor."""
+    if before:
+        ts, eid = parse_cursor(before)
+        query = query.where(tuple_(Event.ts_start, Event.id) < tuple_(ts, eid))
+    return query.order_by(Event.ts_start.desc(), Event.id.desc()).limit(limit)
+
+def next_cursor_headers(rows, limit: int) -> Dict[str, str]:
+    # a short page is the last one
+    if not rows or len(rows) < limit:
+        return {}
+    last = rows[-1]
+    return {CURSOR_HEADER: make_cursor(last.ts_start, last.id)}
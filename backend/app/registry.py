@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import SessionLocal, sequence_value
+from .models import Camera, camera_list_seq
+from .settings import settings
+from .schemas import CameraOut
+
+class CameraRegistry:
+    """
+    In-memory copy of the cameras table, versioned by the camera_list_seq
+    sequence so every worker agrees. invalidate() must be called by anything
+    that writes cameras (seed, camera CRUD) after its commit; each worker
+    re-checks the version at most once per CAMERA_RELOAD_SEC and reloads
+    when it moved. An unknown id forces a check (rate-limited the same way)
+    before it is rejected.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Optional[Tuple[int, Dict[str, CameraOut]]] = None    # (version, cameras)
+        self._checked_at = 0.0
+        self._miss_checked_at = 0.0
+
+    async def load(self, db: AsyncSession) -> Tuple[int, Dict[str, CameraOut]]:
+        # version first: a write committed after this read bumps it again
+        version = await sequence_value(db, camera_list_seq)
+        res = await db.execute(select(Camera).order_by(Camera.created_at.asc()))
+        state = version, {c.id: CameraOut(id=c.id, name=c.name, zone=c.zone) for c in res.scalars().all()}
+        with self._lock:
+            self._state = state
+            self._checked_at = time.monotonic()
+        return state
+
+    async def invalidate(self, db: AsyncSession) -> None:
+        """Bump the shared version (a sequence: not rolled back, takes no lock)."""
+        await db.execute(select(camera_list_seq.next_value()))
+        with self._lock:
+            self._state = None
+
+    async def _current(self, force: bool = False) -> Tuple[int, Dict[str, CameraOut]]:
+        state = self._state
+        if state is not None and not force and time.monotonic() - self._checked_at < settings.CAMERA_RELOAD_SEC:
+            return state
+        async with SessionLocal() as db:
+            if state is not None and await sequence_value(db, camera_list_seq) == state[0]:
+                self._checked_at = time.monotonic()
+                return state
+            return await self.load(db)
+
+    async def _lookup(self, camera_id: str) -> Optional[CameraOut]:
+        cam = (await self._current())[1].get(camera_id)
+        if cam is not None:
+            return cam
+        now = time.monotonic()
+        with self._lock:
+            if now - self._miss_checked_at < settings.CAMERA_RELOAD_SEC:
+                return None
+            self._miss_checked_at = now
+        return (await self._current(force=True))[1].get(camera_id)
+
+    async def get(self, camera_id: str) -> Optional[CameraOut]:
+        return await self._lookup(camera_id)
+
+    async def exists(self, camera_id: str) -> bool:
+        return await self._lookup(camera_id) is not None
+
+    async def listing(self) -> Tuple[int, List[CameraOut]]:
+        """Shared version (the /cameras ETag version) and the cameras it covers."""
+        version, cams = await self._current()
+        return version, list(cams.values())
+
+camera_registry = CameraRegistry()
@@ -0,0 +1,305 @@
+import asyncio
+import heapq
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, or_, select, update
+
+from .db import SessionLocal
+from .httpcache import versions
+from .media import THUMB_SUFFIX, thumb_path_for
+from .models import Event, RecordingSegment
+from .settings import settings
+
+log = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+DAY = 86400.0
+REF_CHUNK = 1000    # paths per IN (...) lookup
+
+@dataclass
+class Policy:
+    name: str
+    path: str
+    max_bytes: int          # 0 = no budget
+    max_age_sec: float      # 0 = no age limit
+    column: Optional[object] = None     # Event column referencing files here, if any
+    segments: bool = False              # files are indexed in recording_segments
+
+class _Walker:
+    """
+    Resumable depth-first scan of one directory, a bounded number of entries
+    per step. Also holds the pass's budget state: bytes kept so far and a
+    bounded heap of the oldest kept files.
+    """
+
+    def __init__(self, root: str, media_root: str, max_candidates: int):
+        self.root = root
+        self.media_root = media_root
+        self._stack = [root]
+        self._it = None
+        self.started = time.time()
+        self.kept_bytes = 0
+        self.max_candidates = max_candidates
+        self._oldest: List[Tuple[float, str, int]] = []    # min-heap on effective age
+
+    def step(self, budget: int) -> Tuple[List[Tuple[str, int, float]], bool]:
+        """
+        Visit up to `budget` entries. Returns the files seen, as
+        (media-relative path, size, mtime), and True once the whole tree has been seen.
+        """
+        batch: List[Tuple[str, int, float]] = []
+        while budget > 0:
+            if self._it is None:
+                if not self._stack:
+                    return batch, True
+                try:
+                    self._it = os.scandir(self._stack.pop())
+                except OSError:
+                    continue
+            try:
+                entry = next(self._it)
+            except (StopIteration, OSError):
+                self._it.close()
+                self._it = None
+                continue
+            budget -= 1
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    self._stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    rel = os.path.relpath(entry.path, self.media_root).replace(os.sep, "/")
+                    batch.append((rel, st.st_size, st.st_mtime))
+            except OSError:
+                pass
+        return batch, False
+
+    def keep(self, age: float, rel: str, size: int) -> None:
+        """Count a surviving file towards the budget; remember it if among the oldest."""
+        self.kept_bytes += size
+        if len(self._oldest) < self.max_candidates:
+            heapq.heappush(self._oldest, (age, rel, size))
+        elif age > self._oldest[0][0]:
+            heapq.heapreplace(self._oldest, (age, rel, size))
+
+    def oldest(self) -> List[Tuple[float, str, int]]:
+        """Remembered files, oldest (effective age) first."""
+        return sorted(self._oldest, reverse=True)
+
+def _ref_key(rel_path: str) -> str:
+    """Path stored on the Event for a file (thumbnails belong to their original)."""
+    if rel_path.endswith(THUMB_SUFFIX):
+        # original extension is unknown here; snapshots are always .jpg
+        return rel_path[: -len(THUMB_SUFFIX)] + ".jpg"
+    return rel_path
+
+def _remove(paths: List[str]) -> int:
+    freed = 0
+    for p in paths:
+        try:
+            freed += os.path.getsize(p)
+            os.remove(p)
+        except OSError:
+            pass
+    return freed
+
+def _missing(paths: List[str], media_root: str) -> List[str]:
+    return [p for p in paths if not os.path.exists(os.path.join(media_root, p))]
+
+class RetentionService:
+    """
+    Background disk-budget enforcement for the media directories.
+
+    Each tick scans at most RETENTION_SCAN_BATCH directory entries per
+    directory and checks at most as many Event rows, so no single step walks
+    the whole tree. Each scanned batch is checked as it arrives; evicted are:
+      - orphans (no Event references them) older than the grace period,
+      - files past the age limit,
+      - once a directory scan completes, oldest-first until the byte budget
+        is met, from the RETENTION_EVICT_CANDIDATES oldest files of the pass
+        (a larger overshoot is worked off over the following passes).
+    Media of events with severity >= RETENTION_HIGH_SEVERITY ages
+    RETENTION_HIGH_SEVERITY_FACTOR times slower. Event paths whose file is
+    gone are set to NULL. Run it in one worker only.
+    """
+
+    def __init__(self):
+        self.media_root = os.path.realpath(settings.MEDIA_DIR)
+        self.policies = [
+            Policy("snapshots", settings.SNAPSHOTS_DIR, int(settings.SNAPSHOTS_MAX_GB * GB),
+                   settings.SNAPSHOTS_MAX_AGE_DAYS * DAY, Event.snapshot_path),
+            Policy("clips", settings.CLIPS_DIR, int(settings.CLIPS_MAX_GB * GB),
+                   settings.CLIPS_MAX_AGE_DAYS * DAY, Event.clip_path),
+            # continuous recordings are not referenced by events: budget/age only
+            Policy("recordings", settings.RECORDINGS_DIR, int(settings.RECORDINGS_MAX_GB * GB),
+                   settings.RECORDINGS_MAX_AGE_DAYS * DAY, segments=True),
+        ]
+        self._walkers: Dict[str, _Walker] = {}
+        self._db_cursor = ""
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+        self.stats = {"passes": 0, "files_deleted": 0, "bytes_freed": 0, "paths_cleared": 0}
+
+    def _walker(self, policy: Policy) -> _Walker:
+        w = self._walkers.get(policy.name)
+        if w is None:
+            w = self._walkers[policy.name] = _Walker(
+                os.path.realpath(policy.path), self.media_root, settings.RETENTION_EVICT_CANDIDATES
+            )
+        return w
+
+    async def tick(self) -> None:
+        for policy in self.policies:
+            w = self._walker(policy)
+            batch, done = await asyncio.to_thread(w.step, settings.RETENTION_SCAN_BATCH)
+            if batch:
+                await self._check_batch(policy, w, batch)
+            if done:
+                del self._walkers[policy.name]
+                await self._enforce_budget(policy, w)
+                self.stats["passes"] += 1
+        await self._clear_missing_paths()
+
+    async def _severities(self, column, keys: List[str]) -> Dict[str, int]:
+        refs: Dict[str, int] = {}
+        for i in range(0, len(keys), REF_CHUNK):
+            chunk = keys[i:i + REF_CHUNK]
+            async with SessionLocal() as db:
+                rows = await db.execute(
+                    select(column, func.max(Event.severity)).where(column.in_(chunk)).group_by(column)
+                )
+                refs.update({path: sev for path, sev in rows.all()})
+        return refs
+
+    def _tracks_refs(self, policy: Policy) -> bool:
+        # outside MEDIA_DIR the stored paths cannot match, so never treat files as orphans there
+        return policy.column is not None and os.path.commonpath(
+            [self.media_root, os.path.realpath(policy.path)]) == self.media_root
+
+    async def _check_batch(self, policy: Policy, w: _Walker, batch: List[Tuple[str, int, float]]) -> None:
+        """Evict orphans and files past the age limit; count the rest towards the budget."""
+        track_refs = self._tracks_refs(policy)
+        refs: Dict[str, int] = {}
+        if track_refs:
+            refs = await self._severities(policy.column, sorted({_ref_key(rel) for rel, _, _ in batch}))
+
+        doomed: List[str] = []
+        for rel, size, mtime in batch:
+            age = w.started - mtime
+            sev = refs.get(_ref_key(rel))
+            if track_refs and sev is None and age > settings.RETENTION_ORPHAN_GRACE_SEC:
+                doomed.append(rel)
+                continue
+            if sev is not None and sev >= settings.RETENTION_HIGH_SEVERITY:
+                age /= settings.RETENTION_HIGH_SEVERITY_FACTOR
+            if policy.max_age_sec and age > policy.max_age_sec:
+                doomed.append(rel)
+            else:
+                w.keep(age, rel, size)
+        await self._evict(policy, doomed, track_refs)
+
+    async def _enforce_budget(self, policy: Policy, w: _Walker) -> None:
+        if not policy.max_bytes:
+            return
+        total = w.kept_bytes
+        doomed: List[str] = []
+        for _, rel, size in w.oldest():
+            if total <= policy.max_bytes:
+                break
+            doomed.append(rel)
+            total -= size
+        await self._evict(policy, doomed, self._tracks_refs(policy))
+
+    async def _evict(self, policy: Policy, doomed: List[str], track_refs: bool) -> None:
+        if not doomed:
+            return
+        abs_paths = [os.path.join(self.media_root, p) for p in doomed]
+        abs_paths += [os.path.join(self.media_root, thumb_path_for(p))
+                      for p in doomed if not p.endswith(THUMB_SUFFIX)]
+        freed = await asyncio.to_thread(_remove, abs_paths)
+        self.stats["files_deleted"] += len(doomed)
+        self.stats["bytes_freed"] += freed
+        log.info("retention: %s evicted %d files (%d bytes)", policy.name, len(doomed), freed)
+
+        if track_refs:
+            # the UPDATE only touches events that actually reference these paths
+            await self._clear(policy.column, sorted({p for p in doomed if not p.endswith(THUMB_SUFFIX)}))
+        if policy.segments:
+            await self._drop_segments(doomed)
+
+    async def _drop_segments(self, paths: List[str]) -> None:
+        for i in range(0, len(paths), REF_CHUNK):
+            async with SessionLocal() as db:
+                await db.execute(
+                    delete(RecordingSegment).where(RecordingSegment.path.in_(paths[i:i + REF_CHUNK]))
+                )
+                await db.commit()
+
+    async def _clear(self, column, paths: List[str]) -> None:
+        cams = set()
+        for i in range(0, len(paths), REF_CHUNK):
+            async with SessionLocal() as db:
+                res = await db.execute(
+                    update(Event).where(column.in_(paths[i:i + REF_CHUNK])).values({column.key: None})
+                    .returning(Event.camera_id)
+                )
+                cleared = res.scalars().all()
+                await db.commit()
+            self.stats["paths_cleared"] += len(cleared)
+            cams.update(cleared)
+        if cams:
+            await versions.bump(cams)
+
+    async def _clear_missing_paths(self) -> None:
+        """Check the next slice of events (by id) for snapshot/clip paths whose file is gone."""
+        async with SessionLocal() as db:
+            rows = (await db.execute(
+                select(Event.id, Event.snapshot_path, Event.clip_path)
+                .where(Event.id > self._db_cursor)
+                .where(or_(Event.snapshot_path.isnot(None), Event.clip_path.isnot(None)))
+                .order_by(Event.id)
+                .limit(settings.RETENTION_SCAN_BATCH)
+            )).all()
+        if not rows:
+            self._db_cursor = ""    # wrap around
+            return
+        self._db_cursor = rows[-1].id
+
+        snaps = [r.snapshot_path for r in rows if r.snapshot_path]
+        clips = [r.clip_path for r in rows if r.clip_path]
+        missing_snaps = await asyncio.to_thread(_missing, snaps, self.media_root)
+        missing_clips = await asyncio.to_thread(_missing, clips, self.media_root)
+        if missing_snaps:
+            await self._clear(Event.snapshot_path, missing_snaps)
+        if missing_clips:
+            await self._clear(Event.clip_path, missing_clips)
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await self.tick()
+            except Exception:
+                log.exception("retention tick failed")
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=settings.RETENTION_INTERVAL_SEC)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stop = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        await self._task
+        self._task = None
+
+retention = RetentionService()
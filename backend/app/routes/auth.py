@@ -1,18 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..models import User
-from ..security import verify_password, create_access_token
+from ..security import create_access_token
 from ..schemas import TokenOut
+from ..settings import settings
+from ..login_guard import login_pool, login_limiter
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/login", response_model=TokenOut)
-def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form.username).first()
-    if not user or not verify_password(form.password, user.password_hash):
+async def login(request: Request, form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    acct_key = f"acct:{form.username.lower()}"
+    ip_key = f"ip:{request.client.host if request.client else 'unknown'}"
+    login_limiter.check(acct_key, settings.LOGIN_MAX_FAILURES)
+    login_limiter.check(ip_key, settings.LOGIN_MAX_FAILURES_PER_IP)
+
+    res = await db.execute(select(User).where(User.email == form.username))
+    user = res.scalars().first()
+    # bcrypt is CPU-bound: verified in the bounded login pool, 429 when saturated
+    if not user or not await login_pool.verify(form.password, user.password_hash):
+        login_limiter.record_failure([acct_key, ip_key])
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    login_limiter.reset(acct_key)
     token = create_access_token(sub=user.id, role=user.role, school_id=user.school_id)
     return TokenOut(access_token=token)
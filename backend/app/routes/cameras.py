@@ -1,14 +1,42 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 
 from ..db import get_db
 from ..models import Camera
 from ..security import require_user
-from ..schemas import CameraOut
+from ..schemas import CameraIn, CameraOut
+from ..registry import camera_registry
+from ..httpcache import cached_json
 
 router = APIRouter(prefix="/cameras", tags=["cameras"])
 
 @router.get("", response_model=list[CameraOut])
-def list_cameras(user=Depends(require_user), db: Session = Depends(get_db)):
-    cams = db.query(Camera).order_by(Camera.created_at.asc()).all()
-    return [CameraOut(id=c.id, name=c.name, zone=c.zone) for c in cams]
+async def list_cameras(request: Request, user=Depends(require_user)):
+    version, cams = await camera_registry.listing()
+
+    async def build():
+        return cams, {}
+
+    return await cached_json(request, ("cameras",), version, build)
+
+@router.post("", response_model=CameraOut)
+async def create_camera(payload: CameraIn, user=Depends(require_user), db: AsyncSession = Depends(get_db)):
+    db.add(Camera(id=payload.id, name=payload.name, zone=payload.zone))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="camera already exists")
+    await camera_registry.invalidate(db)
+    return CameraOut(id=payload.id, name=payload.name, zone=payload.zone)
+
+@router.delete("/{camera_id}")
+async def delete_camera(camera_id: str, user=Depends(require_user), db: AsyncSession = Depends(get_db)):
+    res = await db.execute(delete(Camera).where(Camera.id == camera_id))
+    await db.commit()
+    await camera_registry.invalidate(db)
+    if not res.rowcount:
+        raise HTTPException(status_code=404, detail="camera not found")
+    return {"ok": True, "camera_id": camera_id}
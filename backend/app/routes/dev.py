@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from ..db import get_db
 from ..models import User, Camera
 from ..security import hash_password
+from ..registry import camera_registry
 
 router = APIRouter(prefix="/dev", tags=["dev"])
 
 @router.post("/seed")
-def seed(db: Session = Depends(get_db)):
+async def seed(db: AsyncSession = Depends(get_db)):
     try:
         # Ensure password is within bcrypt's 72-byte limit
         admin_password = "admin123"
@@ -19,7 +21,7 @@ def seed(db: Session = Depends(get_db)):
         admin = User(
             id="admin_1",
             email="admin@rada.ai",
-            password_hash=hash_password(admin_password),
+            password_hash=await run_in_threadpool(hash_password, admin_password),
             role="admin",
             school_id=None,
         )
@@ -31,11 +33,12 @@ def seed(db: Session = Depends(get_db)):
         ]
         db.add(admin)
         db.add_all(cams)
-        db.commit()
+        await db.commit()
+        await camera_registry.invalidate(db)
         return {"ok": True, "admin": {"email":"admin@rada.ai","password":"admin123"}}
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         return {"ok": True, "note": "Already seeded"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Seed failed: {type(e).__name__}: {e}")
\ No newline at end of file
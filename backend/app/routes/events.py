@@ -1,103 +1,171 @@
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
-from ..models import Camera, Event
+from ..models import Event
 from ..schemas import EventIn, EventOut
+from ..ingest import check_payload, apply_transition, apply_batch, attach_snapshot
+from ..ingest_queue import ingest_queue
+from ..registry import camera_registry
+from ..pagination import keyset_page, next_cursor_headers
+from ..httpcache import cached_json, versions
+from ..jsonenc import dumps
+from ..event_stream import event_broker, event_delta, format_sse
+from ..media import thumbnails, thumb_url_for
 from ..security import require_user
+from ..settings import settings
 
 router = APIRouter(prefix="/events", tags=["events"])
 
-def parse_ts(ts: str) -> datetime:
-    try:
-        return datetime.fromisoformat(ts.replace("Z", "+00:00")).replace(tzinfo=None)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid ts format (expected ISO8601 ending with Z)")
+MAX_BATCH = 1000
+STREAM_KEEPALIVE_SEC = 15.0
+
+def event_list_query():
+    """Only the columns EventOut needs, with media URLs built in SQL (NULL stays NULL)."""
+    media = literal("/media/")
+    return select(
+        Event.id,
+        Event.camera_id,
+        Event.event_type,
+        Event.severity,
+        Event.state,
+        Event.ts_start,
+        Event.ts_peak,
+        Event.ts_end,
+        (media + Event.snapshot_path).label("snapshot_url"),
+        (media + Event.clip_path).label("clip_url"),
+        Event.meta,
+        Event.snapshot_path,
+    )
+
+def event_list_item(d: dict) -> dict:
+    """Turn one event_list_query() row (as a dict, modified in place) into the EventOut JSON shape."""
+    d["meta"] = d["meta"] or {}
+    d["thumb_url"] = thumb_url_for(d.pop("snapshot_path"))
+    return d
 
 @router.post("/ingest")
-def ingest(payload: EventIn, db: Session = Depends(get_db)):
+async def ingest(payload: EventIn, db: AsyncSession = Depends(get_db)):
     """
     Ingest events from simulator:
     state: start/ongoing/peak/end
+
+    With INGEST_MODE=async the update is validated, queued for the
+    write-behind writer and acknowledged with 202 (503 while the queue is
+    at INGEST_MAX_PENDING).
     """
-    cam = db.query(Camera).filter(Camera.id == payload.camera_id).first()
-    if not cam:
+    if settings.INGEST_MODE == "async" and ingest_queue.full:
+        ingest_queue.stats["rejected"] += 1
+        raise HTTPException(status_code=503, detail="ingest queue full", headers={"Retry-After": "1"})
+    if not await camera_registry.exists(payload.camera_id):
         raise HTTPException(status_code=400, detail="Invalid camera_id")
 
-    state = payload.state
-    ts = parse_ts(payload.ts)
-
-    evt = db.query(Event).filter(Event.id == payload.event_id).first()
-
-    if state == "start":
-        if evt:
-            return {"ok": True, "note": "already exists"}
-        evt = Event(
-            id=payload.event_id,
-            camera_id=payload.camera_id,
-            event_type=payload.event_type,
-            severity=payload.severity,
-            state="start",
-            ts_start=ts,
-            ts_peak=ts,
-            snapshot_path=payload.snapshot_path,
-            clip_path=payload.clip_path,
-            meta=payload.meta or {},
+    check_payload(payload)
+
+    if settings.INGEST_MODE == "async":
+        ingest_queue.put(payload)
+        return JSONResponse(
+            status_code=202,
+            content={"ok": True, "queued": True, "event_id": payload.event_id, "state": payload.state},
         )
+
+    existing = await db.get(Event, payload.event_id)
+    evt, result = apply_transition(existing, payload)
+    if evt is None:
+        return result
+    # record the immutable content-hashed name, not the producer's scratch path
+    await attach_snapshot(evt, payload)
+    if existing is None:
         db.add(evt)
+    delta = event_delta(evt, payload.ts)
+
+    await db.commit()
+    await versions.bump([evt.camera_id])
+    event_broker.publish([delta])
+    thumbnails.submit(payload.snapshot_path)
+    return result
+
+@router.post("/ingest/batch")
+async def ingest_batch(payloads: list[EventIn], db: AsyncSession = Depends(get_db)):
+    """
+    Ingest many transitions at once. Items are applied in order and written
+    in one transaction; returns one result per item.
+    """
+    if len(payloads) > MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"Batch too large (max {MAX_BATCH})")
+    results = await apply_batch(db, payloads)
+    return {"ok": all(r["ok"] for r in results), "results": results}
 
-    elif state in ("ongoing", "peak"):
-        if not evt:
-            raise HTTPException(status_code=404, detail="event not found")
-        evt.state = state
-        evt.severity = max(evt.severity, payload.severity)
-        evt.ts_peak = ts
-        if payload.snapshot_path:
-            evt.snapshot_path = payload.snapshot_path
-        if payload.clip_path:
-            evt.clip_path = payload.clip_path
-        if payload.meta is not None:
-            evt.meta = payload.meta
-
-    elif state == "end":
-        if not evt:
-            raise HTTPException(status_code=404, detail="event not found")
-        evt.state = "end"
-        evt.ts_end = ts
-        evt.ts_peak = evt.ts_peak or ts
-        if payload.snapshot_path:
-            evt.snapshot_path = payload.snapshot_path
-        if payload.clip_path:
-            evt.clip_path = payload.clip_path
-        if payload.meta is not None:
-            evt.meta = payload.meta
-
-    else:
-        raise HTTPException(status_code=400, detail="Invalid state (start/ongoing/peak/end)")
-
-    db.commit()
-    return {"ok": True, "event_id": payload.event_id, "state": state}
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    user=Depends(require_user),
+    camera_id: Optional[str] = None,
+    min_severity: int = 0,
+    last_id: Optional[int] = None,
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events feed of accepted ingest transitions.
+    Filters: comma-separated `camera_id`, `min_severity`. Resume with the
+    Last-Event-ID header (or `last_id`) to replay missed deltas.
+    """
+    cams = set(camera_id.split(",")) if camera_id else None
+    since = last_id
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    def wanted(d) -> bool:
+        return (cams is None or d["camera_id"] in cams) and d["severity"] >= min_severity
+
+    async def gen():
+        sub, backlog = event_broker.subscribe(since)
+        try:
+            yield "retry: 2000\n\n"
+            for d in backlog:
+                if wanted(d):
+                    yield format_sse(d)
+            while not sub.overflowed:
+                if await request.is_disconnected():
+                    break
+                try:
+                    d = await asyncio.wait_for(sub.queue.get(), timeout=STREAM_KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if wanted(d):
+                    yield format_sse(d)
+        finally:
+            event_broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        gen(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("", response_model=list[EventOut])
-def list_events(user=Depends(require_user), db: Session = Depends(get_db), limit: int = 200):
-    events = db.query(Event).order_by(Event.ts_start.desc()).limit(min(limit, 500)).all()
-
-    out = []
-    for e in events:
-        snapshot_url = f"/media/{e.snapshot_path}" if e.snapshot_path else None
-        clip_url = f"/media/{e.clip_path}" if e.clip_path else None
-        out.append(EventOut(
-            id=e.id,
-            camera_id=e.camera_id,
-            event_type=e.event_type,
-            severity=e.severity,
-            state=e.state,
-            ts_start=e.ts_start.isoformat(),
-            ts_peak=e.ts_peak.isoformat() if e.ts_peak else None,
-            ts_end=e.ts_end.isoformat() if e.ts_end else None,
-            snapshot_url=snapshot_url,
-            clip_url=clip_url,
-            meta=e.meta or {},
-        ))
-    return out
+async def list_events(
+    request: Request,
+    user=Depends(require_user),
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(200, ge=1),
+    before: Optional[str] = None,
+):
+    """
+    Newest events first. Pass the X-Next-Cursor header of a page as
+    `before` to get the next (older) page.
+    """
+    limit = min(limit, 500)
+
+    async def build():
+        rows = (await db.execute(keyset_page(event_list_query(), before, limit))).all()
+        out = [event_list_item(r._asdict()) for r in rows]
+        return dumps(out), next_cursor_headers(rows, limit)
+
+    version = await versions.current(db)
+    return await cached_json(request, ("events", limit, before), version, build)
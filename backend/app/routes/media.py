@@ -0,0 +1,21 @@
+import mimetypes
+import os
+
+from fastapi import APIRouter, HTTPException, Request
+
+from ..media import media_abspath, media_etag, file_response
+
+router = APIRouter(prefix="/media", tags=["media"])
+
+@router.api_route("/{rel_path:path}", methods=["GET", "HEAD"])
+def get_media(rel_path: str, request: Request):
+    """
+    Files under MEDIA_DIR. Content-addressed files are immutable and cached
+    for a year; everything else revalidates with its ETag.
+    """
+    path = media_abspath(rel_path)
+    if path is None or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Not found")
+    etag, cache_control = media_etag(rel_path, path)
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return file_response(request, path, media_type, etag, cache_control)
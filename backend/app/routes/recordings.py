@@ -0,0 +1,132 @@
+import os
+from datetime import timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db import get_db
+from ..ingest import parse_ts
+from ..media import IMMUTABLE, file_response, media_abspath
+from ..models import RecordingSegment
+from ..registry import camera_registry
+from ..schemas import SegmentIn, SegmentOut
+from ..security import require_user
+
+router = APIRouter(prefix="/recordings", tags=["recordings"])
+
+TS_PACKET = 188     # MPEG-TS packet size: byte offsets are aligned to it
+MAX_SEGMENTS = 2000
+# longest accepted segment: lets overlap queries bound their ts_start index scan
+MAX_SEGMENT_SEC = 3600
+
+def _segment_out(s: RecordingSegment) -> SegmentOut:
+    return SegmentOut(
+        id=s.id,
+        camera_id=s.camera_id,
+        ts_start=s.ts_start.isoformat(),
+        ts_end=s.ts_end.isoformat(),
+        byte_size=s.byte_size,
+        url=f"/recordings/segments/{s.id}",
+    )
+
+@router.post("/ingest")
+async def ingest_segment(payload: SegmentIn, db: AsyncSession = Depends(get_db)):
+    """Register a closed recording segment (sent by the recorder)."""
+    if not await camera_registry.exists(payload.camera_id):
+        raise HTTPException(status_code=400, detail="Invalid camera_id")
+    if media_abspath(payload.path) is None:
+        raise HTTPException(status_code=400, detail="Invalid path")
+    ts_start, ts_end = parse_ts(payload.ts_start), parse_ts(payload.ts_end)
+    if ts_end < ts_start:
+        raise HTTPException(status_code=400, detail="ts_end before ts_start")
+    if (ts_end - ts_start).total_seconds() > MAX_SEGMENT_SEC:
+        raise HTTPException(status_code=400, detail=f"segment longer than {MAX_SEGMENT_SEC}s")
+
+    values = dict(
+        camera_id=payload.camera_id,
+        ts_start=ts_start,
+        ts_end=ts_end,
+        path=payload.path,
+        byte_size=payload.byte_size,
+    )
+    stmt = pg_insert(RecordingSegment).values(**values)
+    stmt = stmt.on_conflict_do_update(index_elements=[RecordingSegment.path], set_=values)
+    await db.execute(stmt)
+    await db.commit()
+    return {"ok": True, "path": payload.path}
+
+@router.get("/segments/{segment_id}")
+async def get_segment(segment_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Segment bytes with Range support. Players seek with the byte offset from
+    /recordings/{camera_id}/at and only that part of the file is read.
+    """
+    seg = await db.get(RecordingSegment, segment_id)
+    path = media_abspath(seg.path) if seg else None
+    if path is None or not await run_in_threadpool(os.path.isfile, path):
+        raise HTTPException(status_code=404, detail="segment not found")
+    # closed segments never change
+    etag = f'"seg-{seg.id}-{seg.byte_size:x}"'
+    return await run_in_threadpool(file_response, request, path, "video/mp2t", etag, IMMUTABLE)
+
+@router.get("/{camera_id}/at")
+async def segment_at(
+    camera_id: str,
+    user=Depends(require_user),
+    db: AsyncSession = Depends(get_db),
+    ts: str = Query(...),
+):
+    """
+    Resolve a moment to the segment that contains it plus the offset into it.
+    `byte_offset` assumes a roughly constant bitrate and is packet-aligned;
+    send it as a Range start to seek without downloading the segment head.
+    """
+    t = parse_ts(ts)
+    seg = (await db.execute(
+        select(RecordingSegment)
+        .where(RecordingSegment.camera_id == camera_id, RecordingSegment.ts_start <= t)
+        .order_by(RecordingSegment.ts_start.desc())
+        .limit(1)
+    )).scalars().first()
+    if seg is None or seg.ts_end < t:
+        raise HTTPException(status_code=404, detail="no recording at that time")
+
+    offset = (t - seg.ts_start).total_seconds()
+    duration = max((seg.ts_end - seg.ts_start).total_seconds(), 1e-6)
+    byte_offset = int(seg.byte_size * min(1.0, offset / duration)) // TS_PACKET * TS_PACKET
+    return {
+        "segment": _segment_out(seg),
+        "offset_sec": round(offset, 3),
+        "byte_offset": byte_offset,
+    }
+
+@router.get("/{camera_id}", response_model=list[SegmentOut])
+async def list_segments(
+    camera_id: str,
+    user=Depends(require_user),
+    db: AsyncSession = Depends(get_db),
+    ts_from: str = Query(alias="from"),
+    ts_to: Optional[str] = Query(None, alias="to"),
+    limit: int = Query(500, ge=1, le=MAX_SEGMENTS),
+):
+    """Segments overlapping [from, to], oldest first, for the scrub bar."""
+    start = parse_ts(ts_from)
+    q = (
+        select(RecordingSegment)
+        .where(
+            RecordingSegment.camera_id == camera_id,
+            # no segment is longer than MAX_SEGMENT_SEC: a lower bound for the index scan
+            RecordingSegment.ts_start >= start - timedelta(seconds=MAX_SEGMENT_SEC),
+            RecordingSegment.ts_end >= start,
+        )
+        .order_by(RecordingSegment.ts_start.asc())
+        .limit(limit)
+    )
+    if ts_to:
+        q = q.where(RecordingSegment.ts_start <= parse_ts(ts_to))
+    segs = (await db.execute(q)).scalars().all()
+    return [_segment_out(s) for s in segs]
@@ -1,29 +1,126 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..models import Event
 from ..security import require_user
+from ..pagination import keyset_page, next_cursor_headers
+from ..httpcache import cached_json, versions
+from ..jsonenc import dumps
+from ..media import thumb_url_for
+from ..ingest import parse_ts
 
 router = APIRouter(prefix="/timeline", tags=["timeline"])
 
-@router.get("/{camera_id}")
-def timeline(camera_id: str, user=Depends(require_user), db: Session = Depends(get_db), limit: int = 300):
-    ev = (
-        db.query(Event)
-        .filter(Event.camera_id == camera_id)
-        .order_by(Event.ts_start.desc())
-        .limit(min(limit, 1000))
-        .all()
+MAX_BUCKETS = 2000
+
+async def histogram(
+    db: AsyncSession, camera_ids: Optional[List[str]], ts_from: str, ts_to: str, bucket: int
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Per-camera event counts in fixed `bucket`-second bins over [ts_from, ts_to),
+    aggregated in SQL. Bins are aligned to the epoch; empty bins are omitted.
+    """
+    start, end = parse_ts(ts_from), parse_ts(ts_to)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="`to` must be after `from`")
+    if bucket < 1 or (end - start).total_seconds() / bucket > MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be >= 1s and give at most {MAX_BUCKETS} buckets")
+
+    # inline the (validated) bucket width so SELECT and GROUP BY share one expression
+    width = literal_column(str(int(bucket)))
+    bin_start = (func.floor(func.extract("epoch", Event.ts_start) / width) * width).label("bin_start")
+
+    q = (
+        select(
+            Event.camera_id,
+            bin_start,
+            Event.event_type,
+            func.count().label("n"),
+            func.max(Event.severity).label("max_severity"),
+        )
+        .where(Event.ts_start >= start, Event.ts_start < end)
+        .group_by(Event.camera_id, bin_start, Event.event_type)
     )
-    return [
-        {
-            "id": e.id,
-            "event_type": e.event_type,
-            "severity": e.severity,
-            "state": e.state,
-            "ts_start": e.ts_start.isoformat(),
-            "ts_end": e.ts_end.isoformat() if e.ts_end else None,
-        }
-        for e in ev
-    ]
+    if camera_ids is not None:
+        q = q.where(Event.camera_id.in_(camera_ids))
+
+    cams: Dict[str, Dict[int, Dict[str, Any]]] = {}
+    for cam_id, b, event_type, n, max_sev in (await db.execute(q)).all():
+        b = int(b)
+        entry = cams.setdefault(cam_id, {}).setdefault(b, {
+            "ts": datetime.utcfromtimestamp(b).isoformat(),
+            "count": 0,
+            "max_severity": 0,
+            "by_type": {},
+        })
+        entry["count"] += n
+        entry["max_severity"] = max(entry["max_severity"], max_sev)
+        entry["by_type"][event_type] = n
+
+    return {cam_id: [bins[b] for b in sorted(bins)] for cam_id, bins in cams.items()}
+
+@router.get("/histogram")
+async def timeline_histogram_multi(
+    user=Depends(require_user),
+    db: AsyncSession = Depends(get_db),
+    ts_from: str = Query(alias="from"),
+    ts_to: str = Query(alias="to"),
+    bucket: int = 3600,
+    camera_ids: Optional[str] = None,
+):
+    """Histogram for several cameras (comma-separated `camera_ids`, default all)."""
+    ids = [c for c in camera_ids.split(",") if c] if camera_ids else None
+    return {
+        "from": ts_from,
+        "to": ts_to,
+        "bucket": bucket,
+        "cameras": await histogram(db, ids, ts_from, ts_to, bucket),
+    }
+
+@router.get("/{camera_id}/histogram")
+async def timeline_histogram(
+    camera_id: str,
+    user=Depends(require_user),
+    db: AsyncSession = Depends(get_db),
+    ts_from: str = Query(alias="from"),
+    ts_to: str = Query(alias="to"),
+    bucket: int = 3600,
+):
+    return {
+        "camera_id": camera_id,
+        "from": ts_from,
+        "to": ts_to,
+        "bucket": bucket,
+        "buckets": (await histogram(db, [camera_id], ts_from, ts_to, bucket)).get(camera_id, []),
+    }
+
+@router.get("/{camera_id}")
+async def timeline(
+    camera_id: str,
+    request: Request,
+    user=Depends(require_user),
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(300, ge=1),
+    before: Optional[str] = None,
+):
+    limit = min(limit, 1000)
+
+    async def build():
+        q = select(
+            Event.id, Event.event_type, Event.severity, Event.state, Event.ts_start, Event.ts_end,
+            Event.snapshot_path,
+        ).where(Event.camera_id == camera_id)
+        ev = (await db.execute(keyset_page(q, before, limit))).all()
+        out = []
+        for e in ev:
+            d = e._asdict()
+            d["thumb_url"] = thumb_url_for(d.pop("snapshot_path"))
+            out.append(d)
+        return dumps(out), next_cursor_headers(ev, limit)
+
+    version = await versions.current(db, camera_id)
+    return await cached_json(request, ("timeline", camera_id, limit, before), version, build)
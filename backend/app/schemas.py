@@ -5,6 +5,11 @@ class TokenOut(BaseModel):
     access_token: str
     token_type: str = "bearer"
 
+class CameraIn(BaseModel):
+    id: str
+    name: str
+    zone: Optional[Dict[str, Any]] = None
+
 class CameraOut(BaseModel):
     id: str
     name: str
@@ -33,3 +38,19 @@ class EventOut(BaseModel):
     snapshot_url: Optional[str] = None
     clip_url: Optional[str] = None
     meta: Dict[str, Any] = {}
+    thumb_url: Optional[str] = None
+
+class SegmentIn(BaseModel):
+    camera_id: str
+    path: str           # relative path under media/
+    ts_start: str       # ISO8601 "....Z"
+    ts_end: str
+    byte_size: int = Field(ge=0)
+
+class SegmentOut(BaseModel):
+    id: int
+    camera_id: str
+    ts_start: str
+    ts_end: str
+    byte_size: int
+    url: str
@@ -1,5 +1,9 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
@@ -73,5 +77,58 @@ def decode_token(token: str) -> Dict[str, Any]:
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+class TokenCache:
+    """
+    Bounded LRU of already-verified JWT claims keyed by a SHA-256 digest of
+    the token, so repeat requests from one session skip signature checks.
+    Entries are dropped once the token's `exp` has passed.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None and hit[1] > time.time():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return hit[0]
+            if hit is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: bytes, claims: Dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return  # never cache tokens without an expiry
+        with self._lock:
+            self._data[key] = (claims, float(exp))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
 def require_user(token: str = Depends(oauth2_scheme)) -> dict:
-    return decode_token(token)
\ No newline at end of file
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    claims = token_cache.get(key)
+    if claims is None:
+        claims = decode_token(token)
+        token_cache.put(key, claims)
+    return dict(claims)
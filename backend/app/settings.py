@@ -5,6 +5,19 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "change_me_super_secret"
     JWT_ALG: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080
+    TOKEN_CACHE_SIZE: int = 4096
+
+    # login: bcrypt process pool + failed-attempt limits
+    LOGIN_WORKERS: int = 2
+    LOGIN_MAX_QUEUE: int = 8
+    LOGIN_WINDOW_SEC: int = 300
+    LOGIN_MAX_FAILURES: int = 5
+    LOGIN_MAX_FAILURES_PER_IP: int = 30
+
+    # async engine pool (per worker process)
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
 
     # paths (relative to backend/ by default)
     MEDIA_DIR: str = "../media"
@@ -12,6 +25,36 @@ class Settings(BaseSettings):
     CLIPS_DIR: str = "../media/clips"
     RECORDINGS_DIR: str = "../media/recordings"
 
+    # retention sweeper (run it in one worker only)
+    RETENTION_ENABLED: bool = False
+    RETENTION_INTERVAL_SEC: float = 2.0
+    RETENTION_SCAN_BATCH: int = 2000        # dir entries / event rows checked per tick
+    SNAPSHOTS_MAX_GB: float = 5.0           # 0 = no budget
+    SNAPSHOTS_MAX_AGE_DAYS: float = 30.0    # 0 = no age limit
+    CLIPS_MAX_GB: float = 20.0
+    CLIPS_MAX_AGE_DAYS: float = 30.0
+    RECORDINGS_MAX_GB: float = 50.0
+    RECORDINGS_MAX_AGE_DAYS: float = 7.0
+    RETENTION_HIGH_SEVERITY: int = 70
+    RETENTION_HIGH_SEVERITY_FACTOR: float = 3.0
+    RETENTION_ORPHAN_GRACE_SEC: int = 3600
+    RETENTION_EVICT_CANDIDATES: int = 10000     # oldest files remembered per pass for budget eviction
+
+    # list-view renditions written next to each ingested snapshot
+    THUMB_WIDTH: int = 320
+    THUMB_QUALITY: int = 75
+
+    # how often a worker re-checks the shared camera list version (also the
+    # most often an unknown camera id forces a check)
+    CAMERA_RELOAD_SEC: float = 2.0
+
+    # ingest: "sync" writes each request, "async" queues and flushes in batches
+    INGEST_MODE: str = "sync"
+    INGEST_FLUSH_MS: int = 250
+    INGEST_FLUSH_MAX: int = 500         # items per INSERT (12 bind params each)
+    INGEST_MAX_PENDING: int = 50000     # beyond this, async ingest answers 503
+    INGEST_MAX_RETRIES: int = 3         # failed flushes before items are applied one by one
+
     class Config:
         env_file = ".env"
         extra = "ignore"
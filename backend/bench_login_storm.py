@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: ingest latency with and without a concurrent login storm.
+Start the backend and seed it first (POST /dev/seed), then run from your
+backend directory:
+  python bench_login_storm.py [base_url] [seconds] [login_threads]
+
+Each phase posts `start` events to /events/ingest from a few threads and
+reports p50/p99 latency. During the storm phase other threads hammer
+/auth/login with the admin credentials; with the bcrypt pool in place the
+ingest p99 should stay flat and excess logins should get fast 429s.
+"""
+
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+import requests
+
+BASE = sys.argv[1] if len(sys.argv) > 1 else "http://127.0.0.1:8000"
+SECONDS = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+LOGIN_THREADS = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+INGEST_THREADS = 4
+
+def iso_now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def ingest_worker(stop, latencies):
+    s = requests.Session()
+    while not stop.is_set():
+        payload = {
+            "event_id": f"evt_bench_{uuid.uuid4().hex[:12]}",
+            "camera_id": "cam_1",
+            "event_type": "intrusion",
+            "severity": 50,
+            "state": "start",
+            "ts": iso_now(),
+        }
+        t = time.perf_counter()
+        r = s.post(f"{BASE}/events/ingest", json=payload, timeout=30)
+        latencies.append(time.perf_counter() - t)
+        r.raise_for_status()
+
+def login_worker(stop, codes):
+    s = requests.Session()
+    while not stop.is_set():
+        r = s.post(
+            f"{BASE}/auth/login",
+            data={"username": "admin@rada.ai", "password": "admin123"},
+            timeout=30,
+        )
+        codes[r.status_code] += 1
+
+def run_phase(name, with_storm):
+    stop = threading.Event()
+    latencies = []
+    codes = Counter()
+    threads = [threading.Thread(target=ingest_worker, args=(stop, latencies)) for _ in range(INGEST_THREADS)]
+    if with_storm:
+        threads += [threading.Thread(target=login_worker, args=(stop, codes)) for _ in range(LOGIN_THREADS)]
+    for t in threads:
+        t.start()
+    time.sleep(SECONDS)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    print(f"{name:<12} ingest n={len(latencies):<6} "
+          f"p50={percentile(latencies, 50) * 1e3:7.1f} ms  p99={percentile(latencies, 99) * 1e3:7.1f} ms"
+          + (f"  logins: {dict(codes)}" if with_storm else ""))
+
+def main():
+    print(f"target={BASE} phase={SECONDS}s login_threads={LOGIN_THREADS}\n")
+    run_phase("baseline", with_storm=False)
+    run_phase("login storm", with_storm=True)
+
+if __name__ == "__main__":
+    main()
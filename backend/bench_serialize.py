@@ -0,0 +1,116 @@
+"""
+Benchmark: per-row cost of the /events serialization paths.
+Run this from your backend directory:
+  python bench_serialize.py
+
+"old"  = ORM-style objects -> EventOut per row -> response_model validation
+         -> jsonable_encoder -> json.dumps (what list_events used to do)
+"lean" = column rows as dicts -> event_list_item (as list_events does per
+         row) -> app.jsonenc.dumps (orjson when installed)
+No database is needed; rows are synthetic.
+"""
+
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, '.')
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas import EventOut
+from app.jsonenc import dumps, orjson
+from app.routes.events import event_list_item
+
+def make_orm_rows(n):
+    t0 = datetime(2025, 1, 1, 8, 0, 0)
+    return [
+        SimpleNamespace(
+            id=f"evt_{i:010d}",
+            camera_id=f"cam_{i % 4 + 1}",
+            event_type="intrusion",
+            severity=40 + i % 50,
+            state="end",
+            ts_start=t0 + timedelta(seconds=i),
+            ts_peak=t0 + timedelta(seconds=i, milliseconds=500),
+            ts_end=t0 + timedelta(seconds=i + 3),
+            snapshot_path=f"snapshots/evt_{i:010d}.jpg",
+            clip_path=None,
+            meta={"detector": "sim", "label": "person", "confidence": 0.87, "bbox": [100, 120, 300, 480]},
+        )
+        for i in range(n)
+    ]
+
+def make_lean_rows(orm_rows):
+    # what event_list_query returns: columns only, URLs already built, plus the
+    # raw snapshot_path the route turns into thumb_url
+    return [
+        {
+            "id": e.id,
+            "camera_id": e.camera_id,
+            "event_type": e.event_type,
+            "severity": e.severity,
+            "state": e.state,
+            "ts_start": e.ts_start,
+            "ts_peak": e.ts_peak,
+            "ts_end": e.ts_end,
+            "snapshot_url": f"/media/{e.snapshot_path}" if e.snapshot_path else None,
+            "clip_url": None,
+            "meta": e.meta,
+            "snapshot_path": e.snapshot_path,
+        }
+        for e in orm_rows
+    ]
+
+response_adapter = TypeAdapter(list[EventOut])
+
+def old_path(events):
+    out = []
+    for e in events:
+        snapshot_url = f"/media/{e.snapshot_path}" if e.snapshot_path else None
+        clip_url = f"/media/{e.clip_path}" if e.clip_path else None
+        out.append(EventOut(
+            id=e.id,
+            camera_id=e.camera_id,
+            event_type=e.event_type,
+            severity=e.severity,
+            state=e.state,
+            ts_start=e.ts_start.isoformat(),
+            ts_peak=e.ts_peak.isoformat() if e.ts_peak else None,
+            ts_end=e.ts_end.isoformat() if e.ts_end else None,
+            snapshot_url=snapshot_url,
+            clip_url=clip_url,
+            meta=e.meta or {},
+        ))
+    validated = response_adapter.validate_python(out, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+def lean_path(rows):
+    # r._asdict() in the route builds a fresh dict per row; dict(d) stands in for it
+    return dumps([event_list_item(dict(d)) for d in rows])
+
+def bench(fn, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+def main():
+    print(f"encoder: {'orjson' if orjson else 'stdlib json'}\n")
+    for n in (500, 10_000):
+        orm_rows = make_orm_rows(n)
+        lean_rows = make_lean_rows(orm_rows)
+        repeat = 20 if n <= 500 else 5
+        t_old = bench(old_path, orm_rows, repeat)
+        t_new = bench(lean_path, lean_rows, repeat)
+        print(f"{n:>6} rows  old: {t_old * 1e3:8.2f} ms ({t_old / n * 1e6:6.2f} us/row)"
+              f"  lean: {t_new * 1e3:8.2f} ms ({t_new / n * 1e6:6.2f} us/row)"
+              f"  x{t_old / t_new:.1f}")
+
+if __name__ == "__main__":
+    main()
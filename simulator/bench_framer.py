@@ -0,0 +1,96 @@
+"""
+Benchmark: JPEG stream framing, legacy bytes splitter vs _JpegFramer.
+Run from the simulator folder:
+    python bench_framer.py [frames]
+
+ffmpeg renders `frames` test-pattern frames at 720p and 1080p as an MJPEG
+stream (same settings as the live reader, -q:v 5) into memory. Each framer
+then splits that stream, read in 64 KB pieces like a pipe delivers it, and we
+report frames/sec and CPU time (this process) per 1000 frames.
+"""
+
+import io
+import subprocess
+import sys
+import time
+
+import imageio_ffmpeg
+
+from video_loop import EOI, SOI, _JpegFramer
+
+FRAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+PIPE_CHUNK = 65536
+SIZES = [("720p", 1280, 720), ("1080p", 1920, 1080)]
+
+
+class _Pipe(io.RawIOBase):
+    """In-memory stream that, like a pipe, returns at most PIPE_CHUNK bytes per read."""
+
+    def __init__(self, data: bytes):
+        self._data = memoryview(data)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), PIPE_CHUNK, len(self._data) - self._pos)
+        b[:n] = self._data[self._pos: self._pos + n]
+        self._pos += n
+        return n
+
+    def read(self, n=-1):
+        n = min(n, PIPE_CHUNK, len(self._data) - self._pos)
+        out = bytes(self._data[self._pos: self._pos + n])
+        self._pos += n
+        return out
+
+
+def render_stream(width: int, height: int) -> bytes:
+    cmd = [
+        imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=30",
+        "-frames:v", str(FRAMES),
+        "-f", "image2pipe", "-vcodec", "mjpeg", "-q:v", "5", "pipe:1",
+    ]
+    return subprocess.run(cmd, stdout=subprocess.PIPE, check=True).stdout
+
+
+def legacy_frames(stream):
+    """The previous reader loop: bytes concatenation + full-buffer search."""
+    buf = b""
+    while True:
+        chunk = stream.read(8192)
+        if not chunk:
+            return
+        buf += chunk
+        while True:
+            start = buf.find(SOI)
+            if start == -1:
+                buf = b""
+                break
+            end = buf.find(EOI, start + 2)
+            if end == -1:
+                buf = buf[start:]
+                break
+            yield buf[start: end + 2]
+            buf = buf[end + 2:]
+
+
+def measure(name, frames_iter):
+    wall, cpu = time.perf_counter(), time.process_time()
+    n = sum(1 for _ in frames_iter)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(f"  {name:<8} frames={n:<5} {n / wall:9.0f} fps   cpu {cpu * 1000 / max(n, 1) * 1000:7.1f} ms/1000 frames")
+
+
+def main():
+    for label, w, h in SIZES:
+        data = render_stream(w, h)
+        print(f"{label}: {FRAMES} frames, {len(data) / FRAMES / 1024:.0f} KB/frame")
+        measure("legacy", legacy_frames(_Pipe(data)))
+        measure("framer", _JpegFramer(_Pipe(data)).frames())
+
+
+if __name__ == "__main__":
+    main()
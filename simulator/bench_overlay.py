@@ -0,0 +1,88 @@
+"""
+Benchmark: per-frame overlay CPU (JPEG vs raw pipeline) and pool scaling.
+Run from the simulator folder:
+    python bench_overlay.py [frames] [width]
+
+ffmpeg renders `frames` test-pattern frames once as MJPEG (what the "jpeg"
+mode reads) and once as rgb24 rawvideo (what the "raw" mode reads).
+
+1. Each mode overlays and encodes every frame in this thread, the way the
+   live pipeline does without a pool. CPU is this process only; in raw mode
+   ffmpeg also skips its own JPEG encode, so the real saving is larger.
+2. The raw frames are pushed through process pools of 1, 2, 4, ... workers
+   (up to the core count), showing how overlay+encode fps scales with cores.
+"""
+
+import io
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import imageio_ffmpeg
+
+from video_loop import _DetectionState, _JpegFramer, _overlay_frame, _raw_frames, frame_height
+
+FRAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+WIDTH = int(sys.argv[2]) if len(sys.argv) > 2 else 1280
+HEIGHT = frame_height(WIDTH)
+SIZE = (WIDTH, HEIGHT)
+CAM_NAME = "Bench (cam_1)"
+
+
+def render(*out_args: str) -> bytes:
+    cmd = [
+        imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={WIDTH}x{HEIGHT}:rate=30",
+        "-frames:v", str(FRAMES), *out_args, "pipe:1",
+    ]
+    return subprocess.run(cmd, stdout=subprocess.PIPE, check=True).stdout
+
+
+def measure(name, work):
+    wall, cpu = time.perf_counter(), time.process_time()
+    n = work()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(f"  {name:<10} frames={n:<5} {n / wall:7.1f} fps   cpu {cpu * 1000 / max(n, 1):6.2f} ms/frame")
+    return n / wall, cpu / max(n, 1)
+
+
+def main():
+    mjpeg = render("-f", "image2pipe", "-vcodec", "mjpeg", "-q:v", "5")
+    rgb = render("-f", "rawvideo", "-pix_fmt", "rgb24")
+    detection = _DetectionState(WIDTH, HEIGHT)
+    print(f"{WIDTH}x{HEIGHT}, {FRAMES} frames\n\nin-thread:")
+
+    def jpeg_mode():
+        return sum(1 for f in _JpegFramer(io.BytesIO(mjpeg)).frames()
+                   if _overlay_frame("jpeg", f, SIZE, detection.get(), CAM_NAME))
+
+    def raw_mode():
+        return sum(1 for f in _raw_frames(io.BytesIO(rgb), WIDTH * HEIGHT * 3)
+                   if _overlay_frame("raw", f, SIZE, detection.get(), CAM_NAME))
+
+    _, before = measure("jpeg", jpeg_mode)
+    _, after = measure("raw", raw_mode)
+    print(f"  raw mode uses {before / after:.1f}x less CPU per frame")
+
+    frames = [bytes(f) for f in _raw_frames(io.BytesIO(rgb), WIDTH * HEIGHT * 3)]
+    persons = [detection.get() for _ in frames]
+    print("\nprocess pool (raw frames, wall-clock fps):")
+    workers, cores, base = 1, os.cpu_count() or 1, None
+    while workers <= cores:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # warm up so process start-up isn't timed
+            list(pool.map(_overlay_frame, ["raw"] * workers, frames[:workers],
+                          [SIZE] * workers, persons[:workers], [CAM_NAME] * workers))
+            fps, _ = measure(f"{workers} worker{'s' if workers > 1 else ''}", lambda: sum(
+                1 for jpeg in pool.map(_overlay_frame, ["raw"] * len(frames), frames,
+                                       [SIZE] * len(frames), persons, [CAM_NAME] * len(frames))
+                if jpeg))
+        base = base or fps
+        print(f"             speed-up {fps / base:.1f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: generate_snapshot throughput with and without the template cache.
+Run from the simulator folder:
+    python bench_snapshot.py [count]
+
+"cold" clears the template cache before every snapshot, which costs the same
+as the previous renderer (fresh canvas, grid + scanlines, full-frame blur).
+"cached" renders the same snapshots with the cache kept warm.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from snapshot_gen import _template, generate_snapshot
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+STATES = ["start", "ongoing", "peak", "end"]
+
+
+def render(i: int, out_dir: str):
+    generate_snapshot(
+        out_path=os.path.join(out_dir, f"snap_{i % 10}.jpg"),
+        cam_name="Gate",
+        event_id=f"evt_bench_{i:06d}",
+        label="Loitering",
+        conf=0.81,
+        bbox=(200, 150, 900, 600),
+        severity=30 + i % 60,
+        state=STATES[i % len(STATES)],
+    )
+
+
+def run(name: str, cold: bool, out_dir: str) -> float:
+    _template.cache_clear()
+    t = time.perf_counter()
+    for i in range(COUNT):
+        if cold:
+            _template.cache_clear()
+        render(i, out_dir)
+    rate = COUNT / (time.perf_counter() - t)
+    print(f"  {name:<7} {rate:7.1f} snapshots/s")
+    return rate
+
+
+def main():
+    print(f"{COUNT} snapshots, 1280x720")
+    with tempfile.TemporaryDirectory() as out_dir:
+        before = run("cold", True, out_dir)
+        after = run("cached", False, out_dir)
+    print(f"  speed-up {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
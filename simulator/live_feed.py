@@ -3,13 +3,15 @@ from video_loop import start_mjpeg_server
 
 VIDEO = r"C:\Users\msi\Documents\rada-ai-v1\media\videos\Record.mp4"
 
+# camera id -> source; point each camera at its own recording if you have one
+CAMERAS = {f"cam_{i}": VIDEO for i in range(1, 5)}
+NAMES = {f"cam_{i}": f"Camera {i} (cam_{i})" for i in range(1, 5)}
+
 if __name__ == "__main__":
-    server = start_mjpeg_server(VIDEO, host="127.0.0.1", port=8088, fps=10, width=1280)
+    server = start_mjpeg_server(CAMERAS, host="127.0.0.1", port=8088, fps=10, width=1280, names=NAMES)
     print("✅ MJPEG live feed running:")
-    print("➡️  http://127.0.0.1:8088/cam_1.mjpg")
-    print("➡️  http://127.0.0.1:8088/cam_2.mjpg")
-    print("➡️  http://127.0.0.1:8088/cam_3.mjpg")
-    print("➡️  http://127.0.0.1:8088/cam_4.mjpg")
+    for cam_id in CAMERAS:
+        print(f"➡️  http://127.0.0.1:8088/{cam_id}.mjpg")
     print("\nPress Ctrl+C to stop.")
     try:
         while True:
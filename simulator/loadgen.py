@@ -0,0 +1,214 @@
+"""
+Async load generator: N virtual cameras posting event lifecycles
+(start -> ongoing... -> peak -> end) concurrently over one pooled keep-alive
+HTTP client, paced to a target aggregate ingest rate. Prints ingest latency
+percentiles and error rates every few seconds and a summary at the end.
+
+Run from the simulator folder (backend running and seeded):
+    python loadgen.py --cameras 200 --rate 100 --duration 120
+    python loadgen.py --cameras 200 --rate 100 --create     # register load_000..load_199 first
+or through the simulator with RADA_MODE=LOADGEN (options from RADA_LOAD_* env vars).
+
+Without --create the virtual cameras are spread over the cameras the
+backend already has, since ingest rejects unknown camera ids.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+API = os.getenv("RADA_API", "http://127.0.0.1:8000")
+ADMIN_EMAIL = "admin@rada.ai"
+ADMIN_PASSWORD = "admin123"
+
+EVENT_TYPES = ["intrusion", "loitering", "vandalism"]
+LABELS = ["person", "vehicle"]
+
+
+def iso_now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+class Pacer:
+    """Hands out send slots at `rate` per second across all cameras; never bursts to catch up."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = time.perf_counter()
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.perf_counter()
+            # fell behind (backend slower than the target): restart the schedule from now
+            self._next = max(self._next, now - self.interval)
+            slot = self._next
+            self._next += self.interval
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class Stats:
+    """Ingest latencies and outcomes, per reporting window and in total."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.window: List[float] = []
+        self.total: List[float] = []
+        self.errors: Counter = Counter()
+        self.window_errors = 0
+        self.sent = 0
+
+    def record(self, latency: float, error: Optional[str] = None):
+        self.sent += 1
+        if error is None:
+            self.window.append(latency)
+            self.total.append(latency)
+        else:
+            self.errors[error] += 1
+            self.window_errors += 1
+
+    @staticmethod
+    def _line(n_ok: int, n_err: int, latencies: List[float], secs: float) -> str:
+        latencies = sorted(latencies)
+        n = n_ok + n_err
+        return (f"sent={n:<7} ({n / max(secs, 1e-9):7.1f}/s)  err={n_err} ({100 * n_err / max(n, 1):.1f}%)  "
+                f"p50={percentile(latencies, 50) * 1e3:7.1f}ms  "
+                f"p95={percentile(latencies, 95) * 1e3:7.1f}ms  "
+                f"p99={percentile(latencies, 99) * 1e3:7.1f}ms")
+
+    def report(self, secs: float):
+        elapsed = time.perf_counter() - self.started
+        line = self._line(len(self.window), self.window_errors, self.window, secs)
+        print(f"[LOAD] t={elapsed:6.0f}s  {line}"
+              + (f"  errors(total)={dict(self.errors)}" if self.window_errors else ""))
+        self.window, self.window_errors = [], 0
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        n_err = sum(self.errors.values())
+        print(f"\n[LOAD] total {elapsed:.0f}s  {self._line(len(self.total), n_err, self.total, elapsed)}")
+        if self.errors:
+            print(f"[LOAD] errors: {dict(self.errors)}")
+
+
+async def login(client: httpx.AsyncClient) -> str:
+    r = await client.post("/auth/login", data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+    r.raise_for_status()
+    return r.json()["access_token"]
+
+
+async def camera_ids(client: httpx.AsyncClient, n: int, create: bool) -> List[str]:
+    headers = {"Authorization": f"Bearer {await login(client)}"}
+    if create:
+        ids = [f"load_{i:03d}" for i in range(n)]
+        for cam_id in ids:
+            r = await client.post("/cameras", headers=headers,
+                                  json={"id": cam_id, "name": f"Load {cam_id}"})
+            if r.status_code not in (200, 409):
+                r.raise_for_status()
+        return ids
+    r = await client.get("/cameras", headers=headers)
+    r.raise_for_status()
+    existing = [c["id"] for c in r.json()]
+    if not existing:
+        raise SystemExit("No cameras found. Run POST /dev/seed first or pass --create.")
+    return [existing[i % len(existing)] for i in range(n)]
+
+
+async def send(client: httpx.AsyncClient, pacer: Pacer, stats: Stats, payload: Dict) -> None:
+    await pacer.wait()
+    payload["ts"] = iso_now()
+    t = time.perf_counter()
+    try:
+        r = await client.post("/events/ingest", json=payload)
+        error = None if r.status_code in (200, 202) else str(r.status_code)
+    except httpx.HTTPError as e:
+        error = type(e).__name__
+    stats.record(time.perf_counter() - t, error)
+
+
+async def virtual_camera(client: httpx.AsyncClient, pacer: Pacer, stats: Stats,
+                         cam_id: str, steps: range):
+    """One camera: event lifecycles back to back, each state waiting for its send slot."""
+    rng = random.Random()
+    while True:
+        sev = rng.randint(25, 60)
+        payload = {
+            "event_id": f"evt_load_{uuid.uuid4().hex[:12]}",
+            "camera_id": cam_id,
+            "event_type": rng.choice(EVENT_TYPES),
+            "meta": {"detector": "loadgen", "label": rng.choice(LABELS)},
+        }
+        states = ["start"] + ["ongoing"] * rng.choice(steps) + ["peak", "end"]
+        for state in states:
+            if state == "ongoing":
+                sev = min(95, sev + rng.randint(3, 10))
+            await send(client, pacer, stats, {**payload, "state": state, "severity": sev})
+
+
+async def report_loop(stats: Stats, every: float):
+    while True:
+        await asyncio.sleep(every)
+        stats.report(every)
+
+
+async def run(api: str, cameras: int, rate: float, duration: float, create: bool,
+              report_sec: float = 5.0, timeout: float = 10.0):
+    limits = httpx.Limits(max_connections=cameras, max_keepalive_connections=cameras)
+    async with httpx.AsyncClient(base_url=api, limits=limits, timeout=timeout) as client:
+        ids = await camera_ids(client, cameras, create)
+        print(f"[LOAD] {cameras} virtual cameras over {len(set(ids))} camera id(s), "
+              f"target {rate:g} req/s, {'until Ctrl+C' if not duration else f'{duration:g}s'}")
+
+        pacer, stats = Pacer(rate), Stats()
+        tasks = [asyncio.create_task(virtual_camera(client, pacer, stats, cam_id, range(3, 8)))
+                 for cam_id in ids]
+        tasks.append(asyncio.create_task(report_loop(stats, report_sec)))
+        try:
+            if duration:
+                await asyncio.sleep(duration)
+            else:
+                await asyncio.Event().wait()
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            stats.summary()
+
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--api", default=API)
+    p.add_argument("--cameras", type=int, default=int(os.getenv("RADA_LOAD_CAMERAS", "50")))
+    p.add_argument("--rate", type=float, default=float(os.getenv("RADA_LOAD_RATE", "50")),
+                   help="target aggregate ingest requests per second")
+    p.add_argument("--duration", type=float, default=float(os.getenv("RADA_LOAD_DURATION", "60")),
+                   help="seconds to run, 0 = until Ctrl+C")
+    p.add_argument("--create", action="store_true", default=os.getenv("RADA_LOAD_CREATE", "0") == "1",
+                   help="register load_000.. cameras instead of reusing existing ones")
+    p.add_argument("--report", type=float, default=5.0, help="seconds between reports")
+    args = p.parse_args(argv)
+    try:
+        asyncio.run(run(args.api, args.cameras, args.rate, args.duration, args.create, args.report))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
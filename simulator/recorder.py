@@ -0,0 +1,176 @@
+import os
+import subprocess
+import threading
+import time
+from bisect import bisect_right
+from typing import Callable, List, Optional, Set, Tuple
+
+import imageio_ffmpeg
+
+from video_loop import ensure_dir
+
+# Segment files are named by their wall-clock start (local time, as written
+# by ffmpeg's -strftime), e.g. 20250101T081500.ts
+SEGMENT_FMT = "%Y%m%dT%H%M%S"
+SEGMENT_EXT = ".ts"
+
+
+def segment_start(name: str) -> Optional[float]:
+    """Epoch seconds encoded in a segment file name, or None if it isn't one."""
+    stem, ext = os.path.splitext(name)
+    if ext != SEGMENT_EXT:
+        return None
+    try:
+        return time.mktime(time.strptime(stem, SEGMENT_FMT))
+    except ValueError:
+        return None
+
+
+class SegmentRecorder:
+    """
+    Continuously records one camera's source into fixed-length MPEG-TS
+    segments with `-c copy` (no re-encode), under <out_dir>/<camera_id>/.
+    MPEG-TS is used so the still-open newest segment can be read as well.
+    Event clips are cut from the segments with the concat demuxer, also by
+    stream copy.
+
+    `on_segment(camera_id, path, start, end, size)` is called once for every
+    segment after it is closed (i.e. once the next one has started), e.g. to
+    register it in the backend's segment index.
+    """
+
+    def __init__(self, camera_id: str, source: str, out_dir: str, segment_sec: int = 10,
+                 on_segment: Optional[Callable[[str, str, float, float, int], None]] = None):
+        self.camera_id = camera_id
+        self.source = source
+        self.dir = os.path.join(out_dir, camera_id)
+        self.segment_sec = segment_sec
+        self.on_segment = on_segment
+        self._proc: Optional[subprocess.Popen] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._reported: Set[str] = set()
+
+    # ─── recording ───────────────────────────────────────────────────────────
+
+    def _cmd(self) -> List[str]:
+        return [
+            imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error",
+            "-re", "-stream_loop", "-1", "-i", self.source,
+            "-map", "0:v", "-c", "copy",
+            "-f", "segment",
+            "-segment_time", str(self.segment_sec),
+            "-segment_format", "mpegts",
+            "-reset_timestamps", "1",
+            "-strftime", "1",
+            os.path.join(self.dir, SEGMENT_FMT + SEGMENT_EXT),
+        ]
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._proc = subprocess.Popen(self._cmd(),
+                                              stdout=subprocess.DEVNULL,
+                                              stderr=subprocess.DEVNULL)
+                self._proc.wait()
+            except Exception as e:
+                print(f"[REC] {self.camera_id} ffmpeg error: {e}")
+            if not self._stop.is_set():
+                time.sleep(1)
+
+    def _watch(self):
+        while not self._stop.wait(1.0):
+            segs = self.segments()
+            # every segment but the newest is closed
+            for (start, path), (end, _next) in zip(segs, segs[1:]):
+                if path in self._reported:
+                    continue
+                self._reported.add(path)
+                try:
+                    self.on_segment(self.camera_id, path, start, end, os.path.getsize(path))
+                except Exception as e:
+                    print(f"[REC] {self.camera_id} segment callback failed: {e}")
+            # forget segments that were deleted (retention)
+            self._reported &= {p for _, p in segs}
+
+    def start(self) -> "SegmentRecorder":
+        ensure_dir(self.dir)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        if self.on_segment is not None:
+            threading.Thread(target=self._watch, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.terminate()
+
+    # ─── index ───────────────────────────────────────────────────────────────
+
+    def segments(self) -> List[Tuple[float, str]]:
+        """(start_epoch, path) of every segment on disk, oldest first."""
+        out = []
+        try:
+            names = os.listdir(self.dir)
+        except OSError:
+            return out
+        for name in names:
+            t = segment_start(name)
+            if t is not None:
+                out.append((t, os.path.join(self.dir, name)))
+        out.sort()
+        return out
+
+    def covering(self, t0: float, t1: float) -> List[Tuple[float, float, str]]:
+        """(start, end, path) of the segments overlapping [t0, t1]; the newest may still be open."""
+        segs = self.segments()
+        if not segs:
+            return []
+        starts = [s for s, _ in segs]
+        i = max(0, bisect_right(starts, t0) - 1)
+        out = []
+        for j in range(i, len(segs)):
+            start, path = segs[j]
+            end = segs[j + 1][0] if j + 1 < len(segs) else time.time()
+            if start > t1:
+                break
+            if end >= t0:
+                out.append((start, end, path))
+        return out
+
+    # ─── clips ───────────────────────────────────────────────────────────────
+
+    def build_clip(self, t0: float, t1: float, out_path: str, pad: float = 1.0) -> bool:
+        """
+        Write an mp4 covering [t0 - pad, t1 + pad] by concatenating segments
+        with stream copy. Cut points snap to the nearest earlier keyframe.
+        """
+        segs = self.covering(t0 - pad, t1 + pad)
+        if not segs:
+            return False
+        ensure_dir(os.path.dirname(out_path))
+        list_path = out_path + ".txt"
+        lines = []
+        for k, (start, _end, path) in enumerate(segs):
+            lines.append(f"file '{os.path.abspath(path)}'")
+            if k == 0 and t0 - pad > start:
+                lines.append(f"inpoint {t0 - pad - start:.3f}")
+            if k == len(segs) - 1:
+                lines.append(f"outpoint {max(0.0, t1 + pad - start):.3f}")
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+        cmd = [imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-hide_banner", "-loglevel", "error",
+               "-f", "concat", "-safe", "0", "-i", list_path,
+               "-c", "copy", "-movflags", "+faststart", out_path]
+        try:
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            return True
+        except Exception:
+            return False
+        finally:
+            try:
+                os.remove(list_path)
+            except OSError:
+                pass
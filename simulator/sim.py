@@ -2,14 +2,16 @@ import os
 import time
 import uuid
 import random
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 import yaml
 import requests
 
-from snapshot_gen import generate_snapshot
-from video_loop import ffprobe_duration_seconds, ffmpeg_snapshot
+from snapshot_gen import start_pool, submit_snapshot
+from video_loop import ffprobe_duration_seconds, ffmpeg_snapshot, start_pipelines
+from recorder import SegmentRecorder
 
 API = "http://127.0.0.1:8000"
 ADMIN_EMAIL = "admin@rada.ai"
@@ -19,6 +21,12 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 MEDIA_DIR = os.path.join(ROOT, "media")
 SNAP_DIR = os.path.join(MEDIA_DIR, "snapshots")
 VID_DIR = os.path.join(MEDIA_DIR, "videos")
+CLIP_DIR = os.path.join(MEDIA_DIR, "clips")
+REC_DIR = os.path.join(MEDIA_DIR, "recordings")
+
+# VIDEO_LOOP: take snapshots from an already running MJPEG server's frame
+# ring (e.g. live_feed.py at http://127.0.0.1:8088) instead of an ffmpeg seek
+FRAME_URL = os.getenv("RADA_FRAME_URL", "").rstrip("/")
 
 os.makedirs(SNAP_DIR, exist_ok=True)
 os.makedirs(VID_DIR, exist_ok=True)
@@ -48,6 +56,36 @@ def ingest_event(payload: Dict[str, Any]):
     r = requests.post(f"{API}/events/ingest", json=payload, timeout=10)
     r.raise_for_status()
 
+def post_when_ready(payload: Dict[str, Any], render: Optional[Future]):
+    """
+    Runs on the single poster thread: wait for the snapshot to finish
+    rendering, then ingest. One thread keeps each event's states in order.
+    """
+    if render is not None:
+        try:
+            render.result()
+        except Exception as e:
+            print(f"[SIM] snapshot failed for {payload['event_id']}: {e}")
+            payload["snapshot_path"] = None
+    try:
+        ingest_event(payload)
+    except Exception as e:
+        print(f"[SIM] ingest failed for {payload['event_id']} ({payload['state']}): {e}")
+
+def register_segment(camera_id: str, path: str, start: float, end: float, size: int):
+    """Add a closed recording segment to the backend's playback index."""
+    def iso(t: float) -> str:
+        return datetime.fromtimestamp(t, timezone.utc).isoformat().replace("+00:00", "Z")
+
+    r = requests.post(f"{API}/recordings/ingest", json={
+        "camera_id": camera_id,
+        "path": os.path.relpath(path, MEDIA_DIR).replace(os.sep, "/"),
+        "ts_start": iso(start),
+        "ts_end": iso(end),
+        "byte_size": size,
+    }, timeout=10)
+    r.raise_for_status()
+
 def load_scenario(path: str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
@@ -55,9 +93,11 @@ def load_scenario(path: str) -> Dict[str, Any]:
 def clamp(v: int, lo: int, hi: int) -> int:
     return max(lo, min(hi, v))
 
-def make_sim_snapshot(event_id: str, cam_name: str, label: str, conf: float, bbox, severity: int, state: str):
-    snap_file = os.path.join(SNAP_DIR, f"{event_id}.jpg")
-    generate_snapshot(
+def make_sim_snapshot(name: str, event_id: str, cam_name: str, label: str, conf: float,
+                      bbox, severity: int, state: str) -> Tuple[str, Future]:
+    """Queue a render in the snapshot pool; returns the relative path it will have."""
+    snap_file = os.path.join(SNAP_DIR, f"{name}.jpg")
+    render = submit_snapshot(
         out_path=snap_file,
         cam_name=cam_name,
         event_id=event_id,
@@ -67,16 +107,50 @@ def make_sim_snapshot(event_id: str, cam_name: str, label: str, conf: float, bbo
         severity=severity,
         state=state,
     )
-    return os.path.join("snapshots", f"{event_id}.jpg")
-
-def make_video_snapshot(event_id: str, video_path: str, t_sec: float):
-    snap_file = os.path.join(SNAP_DIR, f"{event_id}.jpg")
-    ok = ffmpeg_snapshot(video_path, snap_file, t_sec=t_sec)
+    return os.path.join("snapshots", f"{name}.jpg"), render
+
+def fetch_frame(cam_id: str, out_path: str, at: float) -> bool:
+    """Frame nearest `at` from the MJPEG server at RADA_FRAME_URL."""
+    try:
+        r = requests.get(f"{FRAME_URL}/{cam_id}/snapshot.jpg", params={"at": f"{at:.3f}"}, timeout=2)
+    except requests.RequestException:
+        return False
+    if r.status_code != 200:
+        return False
+    with open(out_path, "wb") as f:
+        f.write(r.content)
+    return True
+
+def make_video_snapshot(name: str, video_path: str, t_sec: float, cam_id: str, pipeline=None):
+    """
+    Frame from the camera's own ring (RADA_FRAME_RING=1), else from the
+    MJPEG server at RADA_FRAME_URL, else an ffmpeg seek. Ring frames carry
+    the live overlay's boxes, not the event's meta.bbox.
+    """
+    snap_file = os.path.join(SNAP_DIR, f"{name}.jpg")
+    ok = pipeline is not None and pipeline.snapshot(snap_file, at=time.time())
+    if not ok and FRAME_URL:
+        ok = fetch_frame(cam_id, snap_file, time.time())
+    if not ok:
+        ok = ffmpeg_snapshot(video_path, snap_file, t_sec=t_sec)
     if not ok:
         return None
-    return os.path.join("snapshots", f"{event_id}.jpg")
+    return os.path.join("snapshots", f"{name}.jpg")
+
+def make_event_clip(event_id: str, recorder: SegmentRecorder, t0: float, t1: float):
+    clip_file = os.path.join(CLIP_DIR, f"{event_id}.mp4")
+    if not recorder.build_clip(t0, t1, clip_file):
+        return None
+    return os.path.join("clips", f"{event_id}.mp4")
 
 def main():
+    mode = os.getenv("RADA_MODE", "SIM_ONLY").upper()
+    if mode == "LOADGEN":
+        # many concurrent virtual cameras; options from RADA_API / RADA_LOAD_* env vars
+        import loadgen      # needs httpx, which the other modes don't
+        loadgen.main([])
+        return
+
     token = login()
     cams = get_cameras(token)
     if not cams:
@@ -89,7 +163,6 @@ def main():
     )
     sc = load_scenario(scenario_path)
 
-    mode = os.getenv("RADA_MODE", "SIM_ONLY").upper()
     video_path = os.getenv("RADA_VIDEO", os.path.join(VID_DIR, "cam1.mp4"))
 
     duration = None
@@ -106,12 +179,44 @@ def main():
             print("[VIDEO_LOOP] Could not detect duration with ffprobe; using fallback 60s.")
             duration = 60.0
 
+    # continuous segmented recording per camera, used to cut event clips
+    recorders: Dict[str, SegmentRecorder] = {}
+    if mode == "VIDEO_LOOP" and os.getenv("RADA_RECORD", "1") == "1":
+        seg_sec = int(os.getenv("RADA_SEGMENT_SEC", "10"))
+        for c in cams:
+            recorders[c["id"]] = SegmentRecorder(
+                c["id"], video_path, REC_DIR, seg_sec, on_segment=register_segment
+            ).start()
+
+    # opt-in live frame pipeline per camera (a full decode, overlay and encode
+    # each): snapshots come from its ring buffer; prefer RADA_FRAME_URL if a
+    # live feed is already running
+    pipelines = {}
+    if mode == "VIDEO_LOOP" and os.getenv("RADA_FRAME_RING", "0") == "1":
+        try:
+            pipelines = start_pipelines(
+                {c["id"]: video_path for c in cams},
+                names={c["id"]: f'{c["name"]} ({c["id"]})' for c in cams},
+                ring_sec=float(os.getenv("RADA_RING_SEC", "10")),
+            )
+        except RuntimeError as e:
+            print(f"[VIDEO_LOOP] Frame pipelines unavailable ({e}); using ffmpeg snapshots.")
+
+    # snapshots render in a process pool; a single poster thread sends each
+    # state once its image is ready, so the event loop never waits on PIL
+    if mode != "VIDEO_LOOP":
+        workers = int(os.getenv("RADA_SNAPSHOT_WORKERS", "0")) or None
+        start_pool(workers)
+    poster = ThreadPoolExecutor(max_workers=1, thread_name_prefix="poster")
+
     print("RADA simulator started")
     print("Mode:", mode)
     print("Scenario:", sc.get("name"), "|", scenario_path)
     print("Cameras:", [c["id"] for c in cams])
     if mode == "VIDEO_LOOP":
         print("Video:", video_path, "| duration:", duration)
+        print("Recording:", "on" if recorders else "off")
+        print("Snapshots:", "frame ring" if pipelines else FRAME_URL or "ffmpeg")
 
     rate_lo, rate_hi = sc["event_rate_sec_range"]
     sev_lo, sev_hi = sc["severity_base_range"]
@@ -136,17 +241,23 @@ def main():
         bh = random.randint(220, 360)
 
         base_sev = random.randint(sev_lo, sev_hi)
+        shot = 0
 
         def snapshot_for_state(state: str, severity: int, bbox):
+            # one file per posted state: the backend moves it to its content address
+            # on ingest, so a later state must never overwrite an earlier one's file
+            name = f"{event_id}_{shot:02d}_{state}"
             if mode == "VIDEO_LOOP":
                 now = time.time()
                 t = (now - loop_start) % float(duration)
-                return make_video_snapshot(event_id, video_path, t_sec=t)
-            return make_sim_snapshot(event_id, cam_name, label, conf, bbox, severity, state)
+                return make_video_snapshot(name, video_path, t_sec=t, cam_id=cam_id,
+                                           pipeline=pipelines.get(cam_id)), None
+            return make_sim_snapshot(name, event_id, cam_name, label, conf, bbox, severity, state)
 
-        def post_state(state: str, severity: int):
-            nonlocal x, y, conf
-            snapshot_path = snapshot_for_state(state, severity, (x, y, x + bw, y + bh))
+        def post_state(state: str, severity: int, clip_path=None):
+            nonlocal x, y, conf, shot
+            snapshot_path, render = snapshot_for_state(state, severity, (x, y, x + bw, y + bh))
+            shot += 1
 
             payload = {
                 "event_id": event_id,
@@ -156,7 +267,7 @@ def main():
                 "state": state,
                 "ts": iso_now(),
                 "snapshot_path": snapshot_path,
-                "clip_path": None,
+                "clip_path": clip_path,
                 "meta": {
                     "detector": "sim_video" if mode == "VIDEO_LOOP" else "sim",
                     "mode": mode,
@@ -165,9 +276,10 @@ def main():
                     "bbox": [x, y, x + bw, y + bh],
                 },
             }
-            ingest_event(payload)
+            poster.submit(post_when_ready, payload, render)
 
         # start
+        started_at = time.time()
         post_state("start", base_sev)
 
         # ongoing
@@ -189,7 +301,10 @@ def main():
         time.sleep(random.uniform(0.8, 1.6))
 
         # end
-        post_state("end", sev)
+        clip_path = None
+        if cam_id in recorders:
+            clip_path = make_event_clip(event_id, recorders[cam_id], started_at, time.time())
+        post_state("end", sev, clip_path)
 
         # gap
         time.sleep(random.uniform(rate_lo, rate_hi))
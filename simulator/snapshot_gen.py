@@ -1,6 +1,11 @@
+import functools
+import multiprocessing
 import os
 import random
-from typing import Tuple, List, Optional
+import threading
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from PIL import Image, ImageDraw, ImageFilter
 
 # ─── Palette ──────────────────────────────────────────────────────────────────
@@ -16,6 +21,8 @@ COLOR_END       = (160, 160, 160)  # grey
 
 LABEL_BG        = (0, 0, 0, 160)   # semi-transparent
 
+HEADER_H        = 110
+
 
 # ─── Mock scene generator ─────────────────────────────────────────────────────
 
@@ -137,11 +144,35 @@ def _draw_scene_noise(draw: ImageDraw.Draw, width: int, height: int):
         draw.line([(0, y), (width, y)], fill=(0, 0, 0, 30), width=1)
 
 
+def _draw_header_chrome(draw: ImageDraw.Draw, width: int):
+    """Static part of the top bar: background and REC dot."""
+    draw.rectangle([0, 0, width, HEADER_H], fill=HEADER_COLOR)
+    draw.ellipse([width - 80, 18, width - 62, 36], fill=(220, 40, 40))
+    draw.text((width - 56, 18), "REC", fill=(220, 40, 40))
+
+
+@functools.lru_cache(maxsize=16)
+def _template(width: int, height: int) -> Tuple[Image.Image, Image.Image]:
+    """
+    Pre-rendered layers for one frame size: the blurred background (grid,
+    scanlines, header chrome) and a crop of its header bar. Nothing in them
+    depends on the event or its state, so one template serves every
+    snapshot of that size. Treat both images as read-only.
+    """
+    img = Image.new("RGB", (width, height), BG_COLOR)
+    draw = ImageDraw.Draw(img, "RGBA")
+    _draw_scene_noise(draw, width, height)
+    _draw_header_chrome(draw, width)
+    # Slight blur for realism
+    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
+    return img, img.crop((0, 0, width, HEADER_H + 1))
+
+
 def _draw_header(draw: ImageDraw.Draw, width: int,
                  cam_name: str, event_id: str, label: str,
                  conf: float, severity: int, state: str,
                  n_persons: int, n_phones: int):
-    """Draw the top info bar."""
+    """Draw the top info bar text (over the template's header chrome)."""
     if state == "peak":
         accent = COLOR_PEAK
     elif state == "end":
@@ -149,8 +180,6 @@ def _draw_header(draw: ImageDraw.Draw, width: int,
     else:
         accent = COLOR_PERSON
 
-    draw.rectangle([0, 0, width, 110], fill=HEADER_COLOR)
-
     # Row 1
     draw.text((16, 10), f"RADA AI v1  |  {cam_name}", fill=(255, 255, 255))
 
@@ -166,10 +195,6 @@ def _draw_header(draw: ImageDraw.Draw, width: int,
     # Row 4 — event id
     draw.text((16, 86), f"event={event_id}", fill=(120, 120, 120))
 
-    # Right side: REC dot
-    draw.ellipse([width - 80, 18, width - 62, 36], fill=(220, 40, 40))
-    draw.text((width - 56, 18), "REC", fill=(220, 40, 40))
-
 
 def _draw_main_bbox(draw: ImageDraw.Draw, bbox: Tuple, state: str):
     """Draw the original event zone/bbox (zone of interest)."""
@@ -232,12 +257,14 @@ def generate_snapshot(
     height: int = 720,
     n_persons: Optional[int] = None,
     n_phones: Optional[int] = None,
-) -> None:
+) -> str:
+    """Render one snapshot JPEG to `out_path` and return the path."""
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
     # Deterministic randomness based on event_id so the same event
-    # always produces the same layout
-    seed = hash(event_id) & 0xFFFFFF
+    # always produces the same layout (crc32, unlike hash(), doesn't
+    # change with PYTHONHASHSEED, so every process agrees)
+    seed = zlib.crc32(event_id.encode("utf-8")) & 0xFFFFFF
 
     rng = random.Random(seed)
 
@@ -249,12 +276,11 @@ def generate_snapshot(
         max_phones = max(0, min(n_persons, severity // 25))
         n_phones = rng.randint(0, max_phones)
 
-    # ── Draw background
-    img = Image.new("RGB", (width, height), BG_COLOR)
+    # ── Background: copy of the cached, pre-blurred template
+    background, header = _template(width, height)
+    img = background.copy()
     draw = ImageDraw.Draw(img, "RGBA")
 
-    _draw_scene_noise(draw, width, height)
-
     # ── Draw zone of interest (dashed bbox)
     _draw_main_bbox(draw, bbox, state)
 
@@ -265,14 +291,61 @@ def generate_snapshot(
     for p in persons:
         _draw_person(draw, p, state, show_phone=True)
 
-    # ── Header bar (drawn last so it's always on top)
+    # ── Header bar (pasted last so it's always on top)
+    img.paste(header, (0, 0))
     _draw_header(
         draw, width,
         cam_name, event_id, label, conf, severity, state,
         n_persons, n_phones
     )
 
-    # ── Slight blur for realism
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
+    img.save(out_path, "JPEG", quality=88)
+    return out_path
+
+
+# ─── Batch / background rendering ─────────────────────────────────────────────
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def start_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Shared render pool, created on first use (default: all cores but one).
+    Workers are spawned, not forked: the caller may already run threads, and
+    a fresh interpreter per worker is what keeps seeding process-independent.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers or max(1, (os.cpu_count() or 2) - 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def submit_snapshot(**job: Any) -> Future:
+    """Render one snapshot in the pool; the future resolves to its out_path."""
+    return start_pool().submit(generate_snapshot, **job)
+
+
+def generate_snapshots(jobs: Iterable[Dict[str, Any]],
+                       workers: Optional[int] = None) -> List[Future]:
+    """
+    Render many snapshots in parallel. Each job is a dict of
+    generate_snapshot keyword arguments; returns one future per job, in
+    order. Call from under `if __name__ == "__main__":` (worker processes
+    re-import the main module on spawn platforms). `workers` only applies
+    to the first call, which creates the pool.
+    """
+    pool = start_pool(workers)
+    return [pool.submit(generate_snapshot, **job) for job in jobs]
+
 
-    img.save(out_path, "JPEG", quality=88)
\ No newline at end of file
+def shutdown(wait: bool = True) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
\ No newline at end of file
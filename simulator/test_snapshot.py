@@ -1,14 +1,14 @@
 """
-Quick test: generates sample snapshots for each state.
+Quick test: generates sample snapshots for each state, then renders them
+again through the (spawned) process pool and checks the outputs are
+identical. Exits non-zero on a mismatch.
 Run from the simulator folder:
     python test_snapshot.py
 """
 import sys, os
 sys.path.insert(0, os.path.dirname(__file__))
 
-from snapshot_gen import generate_snapshot
-
-os.makedirs("test_snapshots", exist_ok=True)
+from snapshot_gen import generate_snapshot, generate_snapshots, shutdown
 
 cases = [
     ("start",   45, "evt_a1b2c3d4e5", "Loitering",  0.81),
@@ -17,10 +17,9 @@ cases = [
     ("end",     88, "evt_p6q7r8s9t0", "Loitering",  0.76),
 ]
 
-for state, severity, eid, label, conf in cases:
-    out = f"test_snapshots/{state}_{label.replace(' ','_')}.jpg"
-    generate_snapshot(
-        out_path=out,
+def job(state, severity, eid, label, conf, out_dir):
+    return dict(
+        out_path=f"{out_dir}/{state}_{label.replace(' ','_')}.jpg",
         cam_name="Gate",
         event_id=eid,
         label=label,
@@ -29,6 +28,30 @@ for state, severity, eid, label, conf in cases:
         severity=severity,
         state=state,
     )
-    print(f"✓ {out}")
 
-print("\nDone! Check the test_snapshots/ folder.")
\ No newline at end of file
+def main():
+    os.makedirs("test_snapshots", exist_ok=True)
+
+    for case in cases:
+        out = generate_snapshot(**job(*case, "test_snapshots"))
+        print(f"✓ {out}")
+
+    # the process pool must produce byte-identical images (seeding doesn't depend on the process);
+    # its workers are spawned, so each has its own hash seed
+    futures = generate_snapshots(job(*case, "test_snapshots/parallel") for case in cases)
+    mismatches = 0
+    for fut in futures:
+        out = fut.result()
+        serial = out.replace("/parallel", "")
+        with open(out, "rb") as a, open(serial, "rb") as b:
+            same = a.read() == b.read()
+        print(f"{'✓' if same else '✗'} {out} {'matches' if same else 'DIFFERS FROM'} serial")
+        mismatches += not same
+    shutdown()
+
+    if mismatches:
+        sys.exit(f"\n{mismatches} pooled snapshot(s) differ from the serial render")
+    print("\nDone! Check the test_snapshots/ folder.")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
+import functools
+import json
+import multiprocessing
 import os
 import random
 import subprocess
 import threading
 import time
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from io import BytesIO
-from typing import Optional, List
+from typing import Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
 
 import imageio_ffmpeg
 from PIL import Image, ImageDraw
@@ -172,15 +180,15 @@ def _draw_phone(draw: ImageDraw.Draw, p: dict):
     draw.text((lx + 3, ly + 2), "Phone \U0001f4f1", fill=COLOR_PHONE)
 
 
-def _draw_header(draw: ImageDraw.Draw, w: int,
-                 cam_name: str, n_persons: int, n_phones: int):
-    draw.rectangle([0, 0, w, 100], fill=HEADER_BG)
-    draw.text((16, 10), f"RADA AI v1  |  {cam_name}", fill=(255, 255, 255))
+HEADER_H = 100
 
-    phone_txt = f"  \u26a0 {n_phones} phone(s) detected" if n_phones > 0 else ""
-    draw.text((16, 36),
-              f"Persons: {n_persons}{phone_txt}",
-              fill=COLOR_PHONE if n_phones > 0 else COLOR_PERSON)
+
+@functools.lru_cache(maxsize=64)
+def _header_chrome(w: int, cam_name: str) -> Image.Image:
+    """The static part of the header (background, title, footer line, REC), rendered once per camera."""
+    img  = Image.new("RGB", (w, HEADER_H), HEADER_BG)
+    draw = ImageDraw.Draw(img)
+    draw.text((16, 10), f"RADA AI v1  |  {cam_name}", fill=(255, 255, 255))
 
     draw.text((16, 62),
               "LIVE  \u2022  MJPEG  \u2022  SIMULATED FEED",
@@ -189,168 +197,601 @@ def _draw_header(draw: ImageDraw.Draw, w: int,
     # REC indicator
     draw.ellipse([w - 80, 14, w - 62, 32], fill=(220, 40, 40))
     draw.text((w - 56, 14), "REC", fill=(220, 40, 40))
+    return img
 
 
-def _apply_overlay(frame_bytes: bytes,
-                   detection: "_DetectionState",
-                   cam_name: str) -> bytes:
-    try:
-        img = Image.open(BytesIO(frame_bytes)).convert("RGB")
-        w, h = img.size
-        draw = ImageDraw.Draw(img)
+def _draw_header(img: Image.Image, draw: ImageDraw.Draw,
+                 cam_name: str, n_persons: int, n_phones: int):
+    img.paste(_header_chrome(img.width, cam_name), (0, 0))
 
-        persons  = detection.get()
-        n_phones = sum(1 for p in persons if p["has_phone"])
+    phone_txt = f"  \u26a0 {n_phones} phone(s) detected" if n_phones > 0 else ""
+    draw.text((16, 36),
+              f"Persons: {n_persons}{phone_txt}",
+              fill=COLOR_PHONE if n_phones > 0 else COLOR_PERSON)
 
-        for p in persons:
-            _draw_person(draw, p)
 
-        _draw_header(draw, w, cam_name, len(persons), n_phones)
+def _render_overlay(img: Image.Image, persons: List[dict], cam_name: str) -> bytes:
+    """Draw detections + header into `img` (RGB) and encode it as JPEG once."""
+    draw = ImageDraw.Draw(img)
+    n_phones = sum(1 for p in persons if p["has_phone"])
 
-        buf = BytesIO()
-        img.save(buf, format="JPEG", quality=82)
-        return buf.getvalue()
+    for p in persons:
+        _draw_person(draw, p)
+
+    _draw_header(img, draw, cam_name, len(persons), n_phones)
+
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=82)
+    return buf.getvalue()
+
+
+def _overlay_frame(mode: str, frame, size: Tuple[int, int],
+                   persons: List[dict], cam_name: str) -> Optional[bytes]:
+    """
+    Decode one captured frame, overlay `persons` + header, encode once.
+    mode="raw": `frame` is packed rgb24 of `size`; mode="jpeg": an ffmpeg JPEG.
+    Module level and free of shared state so pool workers can run it.
+    """
+    try:
+        if mode == "raw":
+            img = Image.frombytes("RGB", size, frame)
+        else:
+            img = Image.open(BytesIO(frame)).convert("RGB")
+        return _render_overlay(img, persons, cam_name)
     except Exception:
-        return frame_bytes   # fallback: original frame untouched
+        # fallback: original JPEG untouched; a raw frame can't be sent as is
+        return bytes(frame) if mode == "jpeg" else None
 
 
 # ─── Frame buffer ─────────────────────────────────────────────────────────────
 
+class _Client:
+    """One viewer's bounded frame queue; when it is full the oldest frame is dropped."""
+
+    def __init__(self, maxlen: int):
+        self._frames: Deque[Tuple[int, bytes]] = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def push(self, seq: int, frame: bytes) -> bool:
+        """Queue a frame without blocking; True if an older one had to be dropped."""
+        with self._cond:
+            dropped = len(self._frames) == self._frames.maxlen
+            if dropped:
+                self.dropped += 1
+            self._frames.append((seq, frame))
+            self._cond.notify()
+        return dropped
+
+    def next(self, timeout: float) -> Optional[Tuple[int, bytes]]:
+        with self._cond:
+            if not self._frames:
+                self._cond.wait(timeout)
+            return self._frames.popleft() if self._frames else None
+
+
+class _FrameRing:
+    """The last `seconds` of encoded frames of one camera, keyed by wall-clock time."""
+
+    def __init__(self, seconds: float, fps: int):
+        n = max(1, int(seconds * fps))
+        self._lock   = threading.Lock()
+        self._times: Deque[float] = deque(maxlen=n)
+        self._frames: Deque[bytes] = deque(maxlen=n)
+
+    def add(self, t: float, frame: bytes):
+        with self._lock:
+            self._times.append(t)
+            self._frames.append(frame)
+
+    def nearest(self, t: Optional[float] = None, tolerance: float = 1.0) -> Optional[bytes]:
+        """Frame closest to epoch `t` (None = latest), or None if `t` isn't covered."""
+        with self._lock:
+            if not self._frames:
+                return None
+            if t is None:
+                return self._frames[-1]
+            i = bisect_left(self._times, t)
+            j = min((k for k in (i - 1, i) if 0 <= k < len(self._times)),
+                    key=lambda k: abs(self._times[k] - t))
+            if abs(self._times[j] - t) > tolerance:
+                return None
+            return self._frames[j]
+
+
 class _FrameBuffer:
-    def __init__(self):
+    """
+    Latest frame of one camera plus fan-out to its viewers. Each frame gets
+    the next sequence number and is pushed once into every subscribed
+    client's bounded queue, so each viewer sees every new frame exactly once
+    and a slow viewer loses frames instead of stalling the reader or others.
+    Frames are also kept in `ring`, if given, for snapshots.
+    """
+
+    def __init__(self, client_queue: int = 2, ring: Optional[_FrameRing] = None):
+        self._cond    = threading.Condition()
         self._frame: Optional[bytes] = None
-        self._lock  = threading.Lock()
-        self._event = threading.Event()
+        self._seq     = 0
+        self._clients: Set[_Client] = set()
+        self.client_queue   = client_queue
+        self.frames_dropped = 0
+        self.ring = ring
 
     def put(self, frame: bytes):
-        with self._lock:
+        if self.ring is not None:
+            self.ring.add(time.time(), frame)
+        with self._cond:
+            self._seq += 1
             self._frame = frame
-        self._event.set()
-        self._event.clear()
+            for c in self._clients:
+                if c.push(self._seq, frame):
+                    self.frames_dropped += 1
+            self._cond.notify_all()
 
     def get(self) -> Optional[bytes]:
-        with self._lock:
+        with self._cond:
             return self._frame
 
-    def wait(self, timeout=5.0):
-        self._event.wait(timeout)
+    def wait(self, timeout=5.0) -> bool:
+        """Block until the first frame exists (no lost wakeups); False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._frame is not None, timeout)
+
+    def subscribe(self) -> _Client:
+        """New viewer, primed with the current frame so it doesn't start blank."""
+        client = _Client(self.client_queue)
+        with self._cond:
+            if self._frame is not None:
+                client.push(self._seq, self._frame)
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client: _Client):
+        with self._cond:
+            self._clients.discard(client)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"seq": self._seq, "clients": len(self._clients),
+                    "frames_dropped": self.frames_dropped}
+
+
+class _OrderedSink:
+    """
+    Feeds frames through a process pool and puts the results into a frame
+    buffer in capture order. Frames get a sequence number at submit time; a
+    finished frame waits until all earlier ones are out. When `max_inflight`
+    frames are already queued or rendering, new frames are skipped rather
+    than letting the stream fall further behind.
+    """
+
+    def __init__(self, buffer: _FrameBuffer, max_inflight: int):
+        self._buffer = buffer
+        self._lock = threading.Lock()
+        self._next_seq = 0      # next sequence number to hand to the buffer
+        self._seq = 0           # next sequence number to assign
+        self._done: Dict[int, Optional[bytes]] = {}
+        self.max_inflight = max_inflight
+        self.frames_skipped = 0
 
+    def submit(self, pool: ProcessPoolExecutor, *args) -> bool:
+        with self._lock:
+            if self._seq - self._next_seq >= self.max_inflight:
+                self.frames_skipped += 1
+                return False
+            seq = self._seq
+            self._seq += 1
+        try:
+            fut = pool.submit(_overlay_frame, *args)
+        except Exception:
+            self._deliver(seq, None)    # the sequence must still complete
+            raise
+        fut.add_done_callback(lambda f: self._complete(seq, f))
+        return True
 
-_buffer    = _FrameBuffer()
-_detection: Optional[_DetectionState] = None
-_cam_name  = "Camera"
+    def _complete(self, seq: int, fut: Future):
+        try:
+            jpeg = fut.result()
+        except Exception:
+            jpeg = None     # the sequence still advances
+        self._deliver(seq, jpeg)
+
+    def _deliver(self, seq: int, jpeg: Optional[bytes]):
+        with self._lock:
+            self._done[seq] = jpeg
+            while self._next_seq in self._done:
+                jpeg = self._done.pop(self._next_seq)
+                self._next_seq += 1
+                if jpeg is not None:
+                    self._buffer.put(jpeg)
 
 
-def _ffmpeg_reader(video_path: str, fps: int, width: int):
-    """Read frames from ffmpeg, apply overlay, push to buffer. Loops forever."""
-    ff  = _ffmpeg_bin()
-    SOI = b"\xff\xd8"
-    EOI = b"\xff\xd9"
+SOI = b"\xff\xd8"
+EOI = b"\xff\xd9"
 
+
+class _JpegFramer:
+    """
+    Splits a concatenated JPEG stream (ffmpeg image2pipe) into frames.
+
+    Reads land directly in a preallocated bytearray via `readinto`, only the
+    bytes that arrived since the last search are scanned for markers, and each
+    frame is copied out exactly once. Leftover bytes are moved to the front
+    only when the buffer fills up; it doubles if a single frame doesn't fit.
+    Pass an unbuffered stream (Popen(bufsize=0)) so a read returns whatever
+    the pipe holds instead of waiting to fill the whole buffer.
+    """
+
+    def __init__(self, stream, size: int = 1 << 20):
+        self._stream = stream
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self._start = 0         # first unconsumed byte (the frame's SOI once found)
+        self._end = 0           # end of valid data
+        self._scan = 0          # where the next marker search resumes
+        self._in_frame = False
+
+    def _next_frame(self) -> Optional[bytes]:
+        buf, end = self._buf, self._end
+        if not self._in_frame:
+            i = buf.find(SOI, self._scan, end)
+            if i == -1:
+                # drop the garbage but keep a trailing 0xff: it may start a split marker
+                self._start = self._scan = max(self._start, end - 1)
+                return None
+            self._start, self._scan, self._in_frame = i, i + 2, True
+        j = buf.find(EOI, self._scan, end)
+        if j == -1:
+            self._scan = max(self._scan, end - 1)
+            return None
+        frame = bytes(self._view[self._start: j + 2])
+        self._start = self._scan = j + 2
+        self._in_frame = False
+        return frame
+
+    def _make_room(self):
+        n = self._end - self._start
+        if n > len(self._buf) // 2:
+            grown = bytearray(len(self._buf) * 2)
+            grown[:n] = self._view[self._start: self._end]
+            self._view.release()
+            self._buf, self._view = grown, memoryview(grown)
+        else:
+            self._view[:n] = self._view[self._start: self._end]
+        self._scan -= self._start
+        self._start, self._end = 0, n
+
+    def _fill(self) -> bool:
+        if self._end == len(self._buf):
+            self._make_room()
+        n = self._stream.readinto(self._view[self._end:])
+        if not n:
+            return False
+        self._end += n
+        return True
+
+    def frames(self) -> Iterator[bytes]:
+        """Yield complete frames until the stream ends."""
+        while True:
+            frame = self._next_frame()
+            if frame is not None:
+                yield frame
+            elif not self._fill():
+                return
+
+
+def _raw_frames(stream, frame_size: int) -> Iterator[memoryview]:
+    """
+    Fixed-size frames from an unbuffered rawvideo pipe, read with `readinto`
+    into one reused buffer. Each view is only valid until the next one.
+    """
+    buf  = bytearray(frame_size)
+    view = memoryview(buf)
     while True:
-        cmd = [
-            ff, "-re", "-i", video_path,
-            "-vf", f"scale={width}:-1,fps={fps}",
+        got = 0
+        while got < frame_size:
+            n = stream.readinto(view[got:])
+            if not n:
+                return
+            got += n
+        yield view
+
+
+# ─── Per-camera pipeline ──────────────────────────────────────────────────────
+
+PIPELINE_MODES = ("raw", "jpeg")
+
+
+def frame_height(width: int) -> int:
+    """Output height for a stream `width` px wide: 16:9, even (yuv/jpeg friendly)."""
+    return width * 9 // 16 // 2 * 2
+
+
+class _CameraPipeline:
+    """
+    One camera: its own ffmpeg reader thread, overlay state and frame buffer.
+
+    mode="raw" (default): ffmpeg scales/letterboxes to a fixed 16:9 size and
+    emits rgb24 frames; overlays are drawn on those and each frame is JPEG
+    encoded once. mode="jpeg": ffmpeg emits JPEGs which are decoded, drawn
+    on and re-encoded (two encodes per frame; kept for comparison).
+
+    With a `pool`, decode/overlay/encode runs in worker processes (see
+    _OrderedSink) and the reader thread only captures frames and advances
+    the mock detections.
+
+    The last `ring_sec` seconds of output frames stay in memory so
+    snapshot() can write one without touching the source video.
+    """
+
+    def __init__(self, cam_id: str, source: str, fps: int, width: int, cam_name: str,
+                 client_queue: int = 2, mode: str = "raw",
+                 pool: Optional[ProcessPoolExecutor] = None, max_inflight: int = 4,
+                 ring_sec: float = 10.0):
+        if mode not in PIPELINE_MODES:
+            raise ValueError(f"mode must be one of {PIPELINE_MODES}")
+        self.cam_id    = cam_id
+        self.source    = source
+        self.fps       = fps
+        self.width     = width
+        self.height    = frame_height(width)
+        self.cam_name  = cam_name
+        self.mode      = mode
+        self.ring      = _FrameRing(ring_sec, fps) if ring_sec > 0 else None
+        self.buffer    = _FrameBuffer(client_queue, self.ring)
+        self.detection = _DetectionState(width=width, height=self.height)
+        self.pool      = pool
+        self.sink      = _OrderedSink(self.buffer, max_inflight)
+
+    def _cmd(self) -> List[str]:
+        cmd = [_ffmpeg_bin(), "-re", "-i", self.source]
+        if self.mode == "raw":
+            w, h = self.width, self.height
+            return cmd + [
+                "-vf", (f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                        f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,fps={self.fps}"),
+                "-f", "rawvideo",
+                "-pix_fmt", "rgb24",
+                "pipe:1",
+            ]
+        return cmd + [
+            "-vf", f"scale={self.width}:-1,fps={self.fps}",
             "-f", "image2pipe",
             "-vcodec", "mjpeg",
             "-q:v", "5",
             "pipe:1",
         ]
-        try:
-            proc = subprocess.Popen(cmd,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.DEVNULL)
-            buf = b""
-            while True:
-                chunk = proc.stdout.read(8192)
-                if not chunk:
-                    break
-                buf += chunk
-
-                while True:
-                    start = buf.find(SOI)
-                    if start == -1:
-                        buf = b""
-                        break
-                    end = buf.find(EOI, start + 2)
-                    if end == -1:
-                        buf = buf[start:]
-                        break
-                    raw = buf[start: end + 2]
-                    buf = buf[end + 2:]
-
-                    if _detection is not None:
-                        raw = _apply_overlay(raw, _detection, _cam_name)
-
-                    _buffer.put(raw)
-
-            proc.wait()
-        except Exception as e:
-            print(f"[MJPEG] reader error: {e}")
-            time.sleep(1)
-        # video ended → loop back
+
+    def _captured(self, stdout) -> Iterator:
+        if self.mode == "raw":
+            return _raw_frames(stdout, self.width * self.height * 3)
+        return _JpegFramer(stdout).frames()
+
+    def _process(self, frame):
+        size, persons = (self.width, self.height), self.detection.get()
+        if self.pool is None:
+            jpeg = _overlay_frame(self.mode, frame, size, persons, self.cam_name)
+            if jpeg is not None:
+                self.buffer.put(jpeg)
+        else:
+            # raw frames are views into the reader's reused buffer, and the boxes are
+            # nudged in place by the next get(); the pool pickles both later on its
+            # feeder thread, so copy them before handing off
+            boxes = [dict(p) for p in persons]
+            try:
+                self.sink.submit(self.pool, self.mode, bytes(frame), size, boxes, self.cam_name)
+            except BrokenProcessPool:
+                print(f"[MJPEG] {self.cam_id} overlay pool broke; rendering in-thread")
+                self.pool = None
+
+    def stats(self) -> dict:
+        return {**self.buffer.stats(), "frames_skipped": self.sink.frames_skipped}
+
+    def frame_at(self, at: Optional[float] = None, tolerance: float = 1.0) -> Optional[bytes]:
+        """Buffered JPEG nearest to epoch `at` (None = latest); None if outside the ring."""
+        if self.ring is None:
+            return self.buffer.get() if at is None else None
+        return self.ring.nearest(at, tolerance)
+
+    def snapshot(self, out_path: str, at: Optional[float] = None, tolerance: float = 1.0) -> bool:
+        """Write the frame_at(at) JPEG to `out_path`; False if there is none (fall back to ffmpeg)."""
+        frame = self.frame_at(at, tolerance)
+        if frame is None:
+            return False
+        ensure_dir(os.path.dirname(out_path) or ".")
+        tmp = f"{out_path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(frame)
+        os.replace(tmp, out_path)
+        return True
+
+    def _reader(self):
+        """Read frames from ffmpeg, apply overlay, push to buffer. Loops forever."""
+        while True:
+            try:
+                proc = subprocess.Popen(self._cmd(),
+                                        stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL,
+                                        bufsize=0)
+                for frame in self._captured(proc.stdout):
+                    self._process(frame)
+
+                proc.wait()
+            except Exception as e:
+                print(f"[MJPEG] {self.cam_id} reader error: {e}")
+                time.sleep(1)
+            # video ended → loop back
+
+    def start(self) -> "_CameraPipeline":
+        threading.Thread(target=self._reader, daemon=True,
+                         name=f"mjpeg-{self.cam_id}").start()
+        return self
 
 
 # ─── HTTP handler ─────────────────────────────────────────────────────────────
 
 class _MJPEGHandler(BaseHTTPRequestHandler):
+    """
+    Serves /<cam_id>.mjpg (or /<cam_id>) from that camera's pipeline,
+    /<cam_id>/snapshot.jpg[?at=<epoch seconds>] from its frame ring, and
+    /stats with per-camera client, dropped and skipped frame counters.
+    """
+
     def log_message(self, format, *args):
         pass
 
+    def _route(self) -> str:
+        name = self.path.split("?", 1)[0].strip("/")
+        if name.endswith(".mjpg"):
+            name = name[: -len(".mjpg")]
+        return name
+
+    def _send_snapshot(self, cam_id: str):
+        pipeline = self.server.pipelines.get(cam_id)
+        query = parse_qs(urlsplit(self.path).query)
+        try:
+            at = float(query["at"][0]) if "at" in query else None
+        except ValueError:
+            self.send_error(400, "bad at")
+            return
+        frame = pipeline.frame_at(at) if pipeline else None
+        if frame is None:
+            self.send_error(404, "no frame")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(frame)))
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(frame)
+
+    def _send_stats(self):
+        body = json.dumps({cam_id: p.stats()
+                           for cam_id, p in self.server.pipelines.items()}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
     def do_GET(self):
+        name = self._route()
+        if name == "stats":
+            self._send_stats()
+            return
+        if name.endswith("/snapshot.jpg"):
+            self._send_snapshot(name[: -len("/snapshot.jpg")])
+            return
+        pipeline = self.server.pipelines.get(name)
+        if pipeline is None:
+            self.send_error(404, "unknown camera")
+            return
+
         self.send_response(200)
         self.send_header("Content-Type",
                          "multipart/x-mixed-replace; boundary=frame")
         self.send_header("Cache-Control", "no-cache")
         self.send_header("Access-Control-Allow-Origin", "*")
         self.end_headers()
+        client = pipeline.buffer.subscribe()
         try:
             while True:
-                frame = _buffer.get()
-                if frame is None:
-                    _buffer.wait(timeout=2.0)
+                item = client.next(timeout=2.0)
+                if item is None:
                     continue
+                _seq, frame = item
                 self.wfile.write(
                     b"--frame\r\n"
                     b"Content-Type: image/jpeg\r\n\r\n"
                     + frame + b"\r\n"
                 )
                 self.wfile.flush()
-                time.sleep(0.05)
         except (BrokenPipeError, ConnectionResetError):
             pass
+        finally:
+            pipeline.buffer.unsubscribe(client)
 
 
 # ─── Public API ───────────────────────────────────────────────────────────────
 
+def start_pipelines(
+    sources: Dict[str, str],
+    fps: int = 10,
+    width: int = 1280,
+    names: Optional[Dict[str, str]] = None,
+    client_queue: int = 2,
+    mode: str = "raw",
+    workers: int = 0,
+    ring_sec: float = 10.0,
+) -> Dict[str, _CameraPipeline]:
+    """
+    Start one pipeline per camera (camera id -> video path) and wait up to
+    10 s for first frames; raises if no camera produced any. Use directly
+    for in-process frames/snapshots, or via start_mjpeg_server to serve them.
+    """
+    names = names or {}
+    # spawn: reader threads may already be running, and forking a threaded process is unsafe
+    pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) if workers > 0 else None
+
+    pipelines = {
+        cam_id: _CameraPipeline(cam_id, src, fps, width, names.get(cam_id, cam_id),
+                                client_queue, mode, pool, max(2, 2 * workers), ring_sec).start()
+        for cam_id, src in sources.items()
+    }
+
+    print(f"[MJPEG] Waiting for first frames from ffmpeg ({len(pipelines)} camera(s))...")
+    deadline = time.time() + 10.0
+    for p in pipelines.values():
+        p.buffer.wait(timeout=max(0.0, deadline - time.time()))
+    missing = [cam_id for cam_id, p in pipelines.items() if p.buffer.get() is None]
+    if len(missing) == len(pipelines):
+        raise RuntimeError("ffmpeg produced no frames — check your video paths.")
+    for cam_id in missing:
+        print(f"[MJPEG] {cam_id}: no frames yet from {sources[cam_id]}")
+    return pipelines
+
+
 def start_mjpeg_server(
-    video_path: str,
+    sources: Union[str, Dict[str, str]],
     host: str = "127.0.0.1",
     port: int = 8088,
     fps: int = 10,
     width: int = 1280,
     cam_name: str = "Gate (cam_1)",
+    names: Optional[Dict[str, str]] = None,
+    client_queue: int = 2,
+    mode: str = "raw",
+    workers: int = 0,
+    ring_sec: float = 10.0,
 ):
-    global _detection, _cam_name
-    _cam_name = cam_name
-
-    reader = threading.Thread(
-        target=_ffmpeg_reader,
-        args=(video_path, fps, width),
-        daemon=True,
-    )
-    reader.start()
-
-    print("[MJPEG] Waiting for first frame from ffmpeg...")
-    _buffer.wait(timeout=10.0)
-    if _buffer.get() is None:
-        raise RuntimeError("ffmpeg produced no frames — check your video path.")
-
-    # Init detection with actual frame size
-    _detection = _DetectionState(width=width, height=int(width * 9 / 16))
-
-    server = HTTPServer((host, port), _MJPEGHandler)
+    """
+    Serve one MJPEG stream per camera. `sources` maps camera id -> video
+    path, e.g. {"cam_1": "gate.mp4", "cam_2": "hall.mp4"}; each camera gets
+    its own pipeline at http://host:port/<camera id>.mjpg. A single path is
+    served as cam_1 (named `cam_name`). `names` sets overlay titles per camera.
+    Every viewer is served from its own thread and buffers at most
+    `client_queue` frames; beyond that its oldest frames are dropped.
+    Counters are at http://host:port/stats. `mode` selects the frame
+    pipeline ("raw" or "jpeg", see _CameraPipeline). With `workers` > 0,
+    overlay and encoding for all cameras run in a shared pool of that many
+    processes (call this under `if __name__ == "__main__":`); each camera
+    keeps at most 2 * workers frames in flight and skips frames beyond that.
+    The last `ring_sec` seconds per camera are at /<camera id>/snapshot.jpg.
+    """
+    if isinstance(sources, str):
+        sources = {"cam_1": sources}
+        names = {"cam_1": cam_name, **(names or {})}
+    pipelines = start_pipelines(sources, fps, width, names, client_queue, mode, workers, ring_sec)
+
+    server = ThreadingHTTPServer((host, port), _MJPEGHandler)
+    server.daemon_threads = True
+    server.pipelines = pipelines
     threading.Thread(target=server.serve_forever, daemon=True).start()
 
-    print(f"[MJPEG] Live feed + overlay → http://{host}:{port}/cam_1.mjpg")
-    return server
\ No newline at end of file
+    for cam_id in pipelines:
+        print(f"[MJPEG] Live feed + overlay → http://{host}:{port}/{cam_id}.mjpg")
+    return server
@@ -1,9 +1,65 @@
-import { API_MODE } from "./config";
+import { API_BASE, API_MODE } from "./config";
 import { api } from "./client";
 import { mockEvents } from "./mock";
 
-export async function getEvents(limit = 200) {
+export async function getEvents(limit = 200, before) {
   if (API_MODE === "mock") return mockEvents(60);
-  const r = await api.get("/events", { params: { limit } });
+  const r = await api.get("/events", { params: { limit, before } });
   return r.data;
 }
+
+// One page plus the cursor for the next (older) page, or null on the last page.
+export async function getEventsPage(limit = 200, before) {
+  if (API_MODE === "mock") return { items: await mockEvents(60), next: null };
+  const r = await api.get("/events", { params: { limit, before } });
+  return { items: r.data, next: r.headers["x-next-cursor"] || null };
+}
+
+// Subscribe to /events/stream (Server-Sent Events). Uses fetch so the bearer
+// token can be sent; reconnects with Last-Event-ID. onStatus(true/false) reports
+// whether the stream is connected. Returns a stop() function.
+export function streamEvents({ cameraId, minSeverity, onEvent, onStatus = () => {} }) {
+  const ctrl = new AbortController();
+  let lastId = null;
+
+  async function run() {
+    while (!ctrl.signal.aborted) {
+      try {
+        const url = new URL(`${API_BASE}/events/stream`, window.location.href);
+        if (cameraId) url.searchParams.set("camera_id", cameraId);
+        if (minSeverity) url.searchParams.set("min_severity", minSeverity);
+        const headers = { Authorization: api.defaults.headers.common.Authorization };
+        if (lastId) headers["Last-Event-ID"] = lastId;
+
+        const r = await fetch(url, { headers, signal: ctrl.signal });
+        if (!r.ok) throw new Error(`stream ${r.status}`);
+        onStatus(true);
+        const reader = r.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buf = "";
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buf += value;
+          let i;
+          while ((i = buf.indexOf("\n\n")) !== -1) {
+            const block = buf.slice(0, i);
+            buf = buf.slice(i + 2);
+            let data = null;
+            for (const line of block.split("\n")) {
+              if (line.startsWith("id: ")) lastId = line.slice(4);
+              else if (line.startsWith("data: ")) data = line.slice(6);
+            }
+            if (data) onEvent(JSON.parse(data));
+          }
+        }
+      } catch (e) {
+        if (ctrl.signal.aborted) return;
+      }
+      onStatus(false);
+      await new Promise((res) => setTimeout(res, 2000));
+    }
+  }
+
+  if (API_MODE !== "mock") run();
+  return () => ctrl.abort();
+}
@@ -2,8 +2,8 @@ import { API_MODE } from "./config";
 import { api } from "./client";
 import { mockTimeline } from "./mock";
 
-export async function getTimeline(cameraId) {
+export async function getTimeline(cameraId, before) {
   if (API_MODE === "mock") return mockTimeline(cameraId);
-  const r = await api.get(`/timeline/${cameraId}`);
+  const r = await api.get(`/timeline/${cameraId}`, { params: { before } });
   return r.data;
 }
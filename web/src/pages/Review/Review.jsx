@@ -1,5 +1,5 @@
-import React, { useEffect, useMemo, useState } from "react";
-import { getEvents } from "../../api/events";
+import React, { useEffect, useMemo, useRef, useState } from "react";
+import { getEventsPage, streamEvents } from "../../api/events";
 import { getCameras } from "../../api/cameras";
 import Card from "../../components/Card.jsx";
 import Badge from "../../components/Badge.jsx";
@@ -7,33 +7,109 @@ import Spinner from "../../components/Spinner.jsx";
 import EmptyState from "../../components/EmptyState.jsx";
 import { useNavigate } from "react-router-dom";
 
+const PAGE_SIZE = 60;
+const POLL_MS = 2500;
+
+// Join two newest-first lists; `newer` wins for events present in both.
+function mergePage(older, newer) {
+    const ids = new Set(newer.map((e) => e.id));
+    return [...newer, ...older.filter((e) => !ids.has(e.id))];
+}
+
+// Fold one /events/stream delta into the newest-first list.
+function mergeDelta(events, d) {
+    const i = events.findIndex((e) => e.id === d.event_id);
+    const snapshot = d.snapshot_url ? { snapshot_url: d.snapshot_url, thumb_url: d.snapshot_url.replace(/\.[^./]+$/, ".thumb.jpg") } : {};
+    if (i === -1) {
+        const e = {
+            id: d.event_id,
+            camera_id: d.camera_id,
+            event_type: d.event_type,
+            severity: d.severity,
+            state: d.state,
+            ts_start: d.ts,
+            ts_peak: d.ts,
+            ts_end: d.state === "end" ? d.ts : null,
+            snapshot_url: null,
+            thumb_url: null,
+            meta: {},
+            ...snapshot,
+        };
+        return [e, ...events];
+    }
+    const next = events.slice();
+    next[i] = {
+        ...events[i],
+        severity: d.severity,
+        state: d.state,
+        ts_peak: d.state === "end" ? events[i].ts_peak : d.ts,
+        ts_end: d.state === "end" ? d.ts : events[i].ts_end,
+        ...snapshot,
+    };
+    return next;
+}
+
 export default function Review() {
     const [loading, setLoading] = useState(true);
     const [events, setEvents] = useState([]);
     const [cameras, setCameras] = useState([]);
     const [filterCam, setFilterCam] = useState("all");
+    const [next, setNext] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const paged = useRef(false);
     const navigate = useNavigate();
 
     useEffect(() => {
         let alive = true;
         async function load() {
             try {
-                const [cams, ev] = await Promise.all([getCameras(), getEvents(200)]);
+                const [cams, page] = await Promise.all([getCameras(), getEventsPage(PAGE_SIZE)]);
                 if (!alive) return;
                 setCameras(cams);
-                setEvents(ev);
+                setEvents((ev) => mergePage(ev, page.items));
+                // later reloads only refresh the newest page; keep the oldest cursor
+                if (!paged.current) {
+                    paged.current = true;
+                    setNext(page.next);
+                }
             } finally {
                 if (alive) setLoading(false);
             }
         }
         load();
-        const t = setInterval(load, 2500); // refresh like Frigate
+
+        // live updates from the SSE stream; poll only while it is down
+        let poll = null;
+        const stop = streamEvents({
+            onEvent: (d) => alive && setEvents((ev) => mergeDelta(ev, d)),
+            onStatus: (up) => {
+                if (up && poll) {
+                    clearInterval(poll);
+                    poll = null;
+                    load(); // catch up on anything missed while polling
+                } else if (!up && !poll) {
+                    poll = setInterval(load, POLL_MS);
+                }
+            },
+        });
         return () => {
             alive = false;
-            clearInterval(t);
+            stop();
+            if (poll) clearInterval(poll);
         };
     }, []);
 
+    async function loadMore() {
+        setLoadingMore(true);
+        try {
+            const page = await getEventsPage(PAGE_SIZE, next);
+            setEvents((ev) => mergePage(page.items, ev));
+            setNext(page.next);
+        } finally {
+            setLoadingMore(false);
+        }
+    }
+
     const filtered = useMemo(() => {
         if (filterCam === "all") return events;
         return events.filter((e) => e.camera_id === filterCam);
@@ -62,7 +138,7 @@ export default function Review() {
                 </div>
 
                 <div className="cards">
-                    {filtered.slice(0, 60).map((e) => (
+                    {filtered.map((e) => (
                         <Card key={e.id} onClick={() => navigate(`/events/${e.id}`)}>
                             <div className="card-row">
                                 <div>
@@ -78,7 +154,16 @@ export default function Review() {
                             </div>
 
                             {e.snapshot_url ? (
-                                <img className="thumb" src={`http://127.0.0.1:8000${e.snapshot_url}`} alt="snapshot" />
+                                <img
+                                    className="thumb"
+                                    src={`http://127.0.0.1:8000${e.thumb_url || e.snapshot_url}`}
+                                    onError={(ev) => {
+                                        // thumbnail may still be rendering: fall back to the full snapshot
+                                        const full = `http://127.0.0.1:8000${e.snapshot_url}`;
+                                        if (ev.currentTarget.src !== full) ev.currentTarget.src = full;
+                                    }}
+                                    alt="snapshot"
+                                />
                             ) : (
                                 <div className="thumb placeholder">
                                     <div className="muted">No snapshot (mock)</div>
@@ -87,6 +172,12 @@ export default function Review() {
                         </Card>
                     ))}
                 </div>
+
+                {next && (
+                    <button className="btn" onClick={loadMore} disabled={loadingMore}>
+                        {loadingMore ? "Loading..." : "Load more"}
+                    </button>
+                )}
             </div>
         </div>
     );